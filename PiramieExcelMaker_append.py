@@ -38,16 +38,33 @@ Mapping (Monthly -> APR Bundle):
 
 from __future__ import annotations
 
+import functools
+import math
 import os
 import re
 import sys
 import shutil
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+try:
+    import fcntl  # POSIX only; used for copy-on-write backups
+except ImportError:
+    fcntl = None
 
 import pandas as pd
 from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.compat import safe_string
+from openpyxl.styles.numbers import FORMAT_DATE_DATETIME
+from openpyxl.utils import get_column_letter, range_boundaries
+from openpyxl.utils.datetime import to_excel
+
+from PiramieExcelMaker_ooxml import NS_MAIN, add_cell_formats, mapped, rel_targets, sheet_part, write_zip_copy
 
 APR_SHEET = "APR Bundle"
 DEDUPE_FIELDS = ["MSISDN", "Purchase Date", "PRODUCT_NAME", "PURCHASE_AMT", "CONTRACT_ID", "PRODUCT_ID"]
@@ -66,10 +83,58 @@ COLUMN_MAP: Dict[str, List[str]] = {
     "CRTR_ID": ["CONTRACT_ID"],
 }
 
+# Low-cardinality monthly columns kept as pandas 'category' (codes instead of strings)
+CATEGORY_COLUMNS = ["Cust Type", "Prod Name", "Package Status", "API Credit Type"]
+# ...and the identity fields among them, compared via shared categories in the dedupe join
+CATEGORY_KEY_FIELDS = ["PRODUCT_NAME"]
+
+# Monthly header aliases (normalized via _norm) -> canonical monthly label
+_ALIASES: Dict[str, str] = {
+    "cust name": "Cust Name",
+    "customer name": "Cust Name",
+
+    "cust type": "Cust Type",
+    "customer type": "Cust Type",
+
+    "msisdn": "MSISDN",
+
+    "purchase date": "Purchase Date",
+    "date": "Purchase Date",
+
+    "prod name": "Prod Name",
+    "product name": "Prod Name",
+
+    "amount": "Amount",
+    "purchase amount": "Amount",
+    "purchase amt": "Amount",
+
+    "package status": "Package Status",
+    "stat": "Package Status",
+
+    # collapse multiple spaces automatically; both map to same
+    "api credit type": "API Credit Type",
+
+    "prod code": "Prod Code",
+    "product id": "Prod Code",
+
+    "crtr_id": "CRTR_ID",
+    "crtr id": "CRTR_ID",
+    "contract id": "CRTR_ID",
+}
+
 # If the monthly report has a fixed sheet name, set it here; else first sheet
 MONTH_SHEET_NAME: Optional[str] = None
 # Your monthly report's headers are on *row 4* (0-indexed header=3)
 MONTH_HEADER_ROW = 3
+# Date layout the reports normally use; anything else falls back to inference
+PURCHASE_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Linux ioctl that clones a file's extents copy-on-write (Btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+# Compiled once: whitespace runs (header normalization) and money punctuation
+_WS_RE = re.compile(r"\s+")
+_MONEY_RE = re.compile(r"[,$]")
 
 
 # -------------------- utilities --------------------
@@ -83,22 +148,63 @@ def _backup_master(master_path: str) -> str:
     os.makedirs(backup_dir, exist_ok=True)
     name, ext = os.path.splitext(os.path.basename(master_path))
     backup_path = os.path.join(backup_dir, f"{name}_backup_{_timestamp()}{ext}")
-    shutil.copy2(master_path, backup_path)
+    _clone_or_copy(master_path, backup_path)
     return backup_path
 
 
+def _clone_or_copy(src: str, dst: str) -> None:
+    """
+    Copy src -> dst, preferring a copy-on-write clone (instant, no data copied)
+    where the filesystem supports it, then the OS copy routine (CopyFileW on
+    Windows: kernel-side, block cloning on ReFS), else a regular shutil.copy2
+    (which already streams via sendfile on Linux / 1 MiB chunks on Windows).
+    A hardlink is deliberately NOT used: openpyxl saves by truncating and
+    rewriting the same inode, so a linked "backup" would be overwritten too.
+    """
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass  # no reflink support here (ext4, tmpfs, other device...)
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            if ctypes.windll.kernel32.CopyFileW(src, dst, False):
+                return
+        except (OSError, AttributeError):
+            pass
+    shutil.copy2(src, dst)
+
+
+@functools.lru_cache(maxsize=1024)
 def _norm(s: str) -> str:
-    """normalize text for header comparisons: collapse spaces, lowercase, strip"""
-    return re.sub(r"\s+", " ", str(s)).strip().lower()
+    """normalize text for header comparisons: collapse spaces, lowercase, strip (cached: headers are a small set)"""
+    return _WS_RE.sub(" ", str(s)).strip().lower()
 
 
-def _read_month_file(month_path: str) -> pd.DataFrame:
+def _read_month_file(month_path: str, reader_engine: Optional[str] = None) -> pd.DataFrame:
     """
     Read the month purchases report (header is on row 4), then normalize/derive.
+    .xlsx files are streamed through a read-only openpyxl handle, or parsed by
+    pd.read_excel with reader_engine when one is given (e.g. "calamine", the
+    Rust reader); legacy .xls always goes through pandas' default engine.
+    pd.read_excel gets dtype=object so its parser keeps text as text, like the
+    openpyxl read ("07997213844" stays a string instead of becoming a number).
     """
     try:
-        # header=3 => Excel row 4 contains the real headers
-        raw = pd.read_excel(month_path, sheet_name=0, header=3)
+        with mapped(month_path) as src:
+            if month_path.lower().endswith(".xls"):
+                # header=3 => Excel row 4 contains the real headers
+                raw = pd.read_excel(src, sheet_name=MONTH_SHEET_NAME or 0, header=MONTH_HEADER_ROW,
+                                    dtype=object)
+            elif reader_engine and reader_engine != "openpyxl":
+                raw = pd.read_excel(src, sheet_name=MONTH_SHEET_NAME or 0, header=MONTH_HEADER_ROW,
+                                    engine=reader_engine, dtype=object)
+            else:
+                raw = _read_month_sheet(src)
     except Exception as e:
         raise RuntimeError(f"Failed to read monthly file '{month_path}': {e}")
 
@@ -108,14 +214,52 @@ def _read_month_file(month_path: str) -> pd.DataFrame:
     return raw
 
 
+def _read_month_sheet(month_src) -> pd.DataFrame:
+    """
+    Load the month sheet (path or file-like) as raw cell values (read-only,
+    cached formula results).
+    Unlike pd.read_excel, text stays text (MSISDN keeps its leading zero).
+    Blank rows are dropped; missing/duplicate headers are named like pandas does.
+    """
+    wb = load_workbook(month_src, read_only=True, data_only=True)
+    try:
+        ws = wb[MONTH_SHEET_NAME] if MONTH_SHEET_NAME else wb.worksheets[0]
+        # exported reports often carry a wrong <dimension> (e.g. "A1"); ignore it
+        ws.reset_dimensions()
+        rows = ws.iter_rows(min_row=MONTH_HEADER_ROW + 1, values_only=True)
+        headers = next(rows, ())
+        width = len(headers)
+        data = [
+            tuple(r[:width]) + (None,) * (width - len(r))
+            for r in rows
+            if any(v is not None for v in r)
+        ]
+    finally:
+        wb.close()
+
+    columns: List[str] = []
+    for i, h in enumerate(headers):
+        name = f"Unnamed: {i}" if h is None else h
+        dup, n = name, 0
+        while dup in columns:
+            n += 1
+            dup = f"{name}.{n}"
+        columns.append(dup)
+    return pd.DataFrame(data, columns=columns)
+
+
 
 def _build_apr_header_index(ws) -> Dict[str, int]:
-    """Row 1 headers in APR sheet -> col index (1-based), normalized."""
+    """
+    Row 1 headers in APR sheet -> col index (1-based), normalized; first occurrence wins.
+    Works on normal and read-only worksheets. Build it once and pass it around.
+    """
     header_map: Dict[str, int] = {}
-    for col_idx, cell in enumerate(ws[1], start=1):
-        if cell.value is None:
+    header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    for col_idx, value in enumerate(header, start=1):
+        if value is None:
             continue
-        header_map[_norm(cell.value)] = col_idx
+        header_map.setdefault(_norm(value), col_idx)
     return header_map
 
 
@@ -128,32 +272,67 @@ def _resolve_target_col(apr_header_map: Dict[str, int], candidates: List[str]) -
     return None
 
 
-def _coerce_for_excel(val):
-    """Convert pandas NA/NaT to None; strip strings; leave datetimes as datetime."""
-    if pd.isna(val):
-        return None
-    if isinstance(val, str):
-        return val.strip()
-    return val
+def _to_datetime(s: pd.Series) -> pd.Series:
+    """
+    Vectorized date parse: the explicit PURCHASE_DATE_FORMAT fast path first,
+    then format inference for whatever it could not parse. Unparseable -> NaT.
+    """
+    parsed = pd.to_datetime(s, format=PURCHASE_DATE_FORMAT, errors="coerce")
+    rest = parsed.isna() & s.notna()
+    if rest.any():
+        parsed.loc[rest] = pd.to_datetime(s[rest], errors="coerce")
+    return parsed
+
+
+def _coerce_for_excel(s: pd.Series) -> list:
+    """
+    Column-wise: convert pandas NA/NaT to None; strip strings; leave datetimes as datetime.
+    Dates and amounts are already typed by _coerce_and_derive.
+    """
+    if s.dtype == object:
+        stripped = s.str.strip()
+        s = stripped.where(stripped.notna(), s)  # non-strings pass through
+    return s.astype(object).where(s.notna(), None).tolist()
 
 
 def _last_used_row(ws, from_row=2, to_col=None):
-    """Find last row that has any value in columns 1..to_col (defaults to header width)."""
+    """
+    Find last row that has any value in columns 1..to_col (defaults to header width).
+    Scans upward from ws.max_row, so a clean sheet costs a single row read.
+    """
     if to_col is None:
         to_col = max((c.column for c in ws[1] if c.value is not None), default=ws.max_column)
-    last = 1
-    for r in range(from_row, ws.max_row + 1):
-        if any(ws.cell(row=r, column=c).value is not None for c in range(1, to_col + 1)):
-            last = r
-    return last, to_col
+    for r in range(ws.max_row, from_row - 1, -1):
+        row = next(ws.iter_rows(min_row=r, max_row=r, max_col=to_col, values_only=True))
+        if any(v is not None for v in row):
+            return r, to_col
+    return 1, to_col
 
 
-def _expand_filters_and_tables(ws):
+def _append_rows(ws, start_row: int, rows) -> int:
+    """
+    Write full-width rows starting at start_row; returns how many were written.
+    Uses openpyxl's ws.append fast path when start_row is the next row it would
+    append to (decided once: ws.max_row walks every cell); if formatted-but-empty
+    rows trail the data, falls back to per-cell writes so placement stays compact.
+    """
+    use_append = start_row == ws.max_row + 1
+    written = 0
+    for row in rows:
+        if use_append:
+            ws.append(row)
+        else:
+            for col_idx, val in enumerate(row, start=1):
+                ws.cell(row=start_row + written, column=col_idx, value=val)
+        written += 1
+    return written
+
+
+def _expand_filters_and_tables(ws, last_row: int, last_col: int):
     """
     Expand AutoFilter ref and any Excel Table(s) to include all appended rows.
     Assumes headers are on row 1 and data begins on row 2.
     """
-    last_row, last_col = _last_used_row(ws, from_row=2)
     end_col_letter = get_column_letter(last_col)
 
     # 1) AutoFilter
@@ -181,162 +360,326 @@ def _expand_filters_and_tables(ws):
                 _, end = tbl.ref.split(":")
                 end_col_letter_current = "".join(filter(str.isalpha, end))
                 tbl.ref = f"{''.join(filter(str.isalpha, start))}1:{end_col_letter_current}{last_row}"
+                # the table's own filter range follows it (as the zip splice does)
+                if getattr(tbl, "autoFilter", None) is not None and tbl.autoFilter.ref:
+                    tbl.autoFilter.ref = tbl.ref
         except Exception:
             continue
 
 
-def _find_header_col(ws, header_text: str) -> Optional[int]:
-    target = _norm(header_text)
-    for c, cell in enumerate(ws[1], start=1):
-        if cell.value is None:
-            continue
-        if _norm(cell.value) == target:
-            return c
-    return None
+# -------------------- fast save: splice rows into the xlsm zip --------------------
 
+_ROW_R_RE = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+_DIMENSION_RE = re.compile(rb'(<dimension\b[^>]*?\bref=")([^"]*)(")')
+_AUTOFILTER_RE = re.compile(rb'(<autoFilter\b[^>]*?\bref=")([^"]*)(")')
+_TABLE_REF_RE = re.compile(rb'(<table\b[^>]*?\bref=")([^"]*)(")')
+_DEFINED_NAME_RE = re.compile(r"(<definedName\b([^>]*)>)([^<]*)(</definedName>)")
 
-def _normalize_purchase_date_column(ws):
-    """Coerce ALL 'Purchase Date' cells to true datetimes; set uniform number format."""
-    col = _find_header_col(ws, "Purchase Date")
-    if not col:
-        return
-    last_row, _ = _last_used_row(ws, from_row=2)
-    for r in range(2, last_row + 1):
-        cell = ws.cell(row=r, column=col)
-        v = cell.value
-        if v is None or isinstance(v, datetime):
-            # already empty or a real datetime
-            continue
-        try:
-            dt = pd.to_datetime(str(v), errors="raise")
-            if pd.notna(dt):
-                cell.value = dt.to_pydatetime()
-                cell.number_format = "yyyy-mm-dd hh:mm:ss"
-        except Exception:
-            # leave as-is if not parseable
-            pass
 
-# Treat these columns as the row identity (use only those that exist in APR headers / month df)
-DEDUPE_FIELDS = ["MSISDN", "Purchase Date", "PRODUCT_NAME", "PURCHASE_AMT", "CONTRACT_ID", "PRODUCT_ID"]
+class _SpliceUnsafe(Exception):
+    """Raised when the zip splice can't reproduce the openpyxl result; callers fall back."""
 
-def _read_existing_keys(ws) -> set[tuple]:
-    """
-    Build a set of identity keys from existing APR rows using DEDUPE_FIELDS.
-    Keys are normalized (dates to second, amounts to float, strings stripped).
-    """
-    # which of the identity fields actually exist on the APR sheet?
-    present = []
-    for f in DEDUPE_FIELDS:
-        col = _find_header_col(ws, f)
-        if col:
-            present.append((f, col))
-    if not present:
-        return set()
-
-    keys = set()
-    last_row, _ = _last_used_row(ws, from_row=2)
-    for r in range(2, last_row + 1):
-        parts = []
-        for f, col in present:
-            v = ws.cell(row=r, column=col).value
-            if v is None:
-                parts.append(None)
-                continue
-            if f == "Purchase Date":
-                dt = pd.to_datetime(v, errors="coerce")
-                parts.append(None if pd.isna(dt) else dt.to_pydatetime().replace(microsecond=0))
-            elif f == "PURCHASE_AMT":
-                try:
-                    parts.append(float(str(v).replace(",", "").replace("$", "").strip()))
-                except Exception:
-                    parts.append(v)
-            else:
-                parts.append(str(v).strip() if isinstance(v, str) else v)
-        keys.add(tuple(parts))
-    return keys
 
-def _make_row_key(series: pd.Series) -> tuple:
-    """
-    Build a normalized key from a monthly DataFrame row using DEDUPE_FIELDS.
-    """
-    parts = []
-    for f in DEDUPE_FIELDS:
-        if f not in series.index or pd.isna(series[f]):
-            parts.append(None)
-            continue
-        v = series[f]
-        if f == "Purchase Date":
-            dt = pd.to_datetime(v, errors="coerce")
-            parts.append(None if pd.isna(dt) else dt.to_pydatetime().replace(microsecond=0))
-        elif f == "PURCHASE_AMT":
-            try:
-                parts.append(float(str(v).replace(",", "").replace("$", "").strip()))
-            except Exception:
-                parts.append(v)
-        else:
-            parts.append(str(v).strip() if isinstance(v, str) else v)
-    return tuple(parts)
+def _cell_xml(ref: str, value, date_style: Optional[bytes]) -> str:
+    """One <c> element the way openpyxl writes it (inline strings, no style)."""
+    if isinstance(value, str):
+        if not value:
+            return ""  # openpyxl writes an empty cell that reads back as None
+        if ILLEGAL_CHARACTERS_RE.search(value):
+            raise _SpliceUnsafe("illegal character")  # openpyxl raises; let it
+        return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(value)}</t></is></c>'
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise _SpliceUnsafe("non-finite number")
+        return f'<c r="{ref}" t="n"><v>{safe_string(value)}</v></c>'
+    if isinstance(value, datetime):
+        if date_style is None or value.tzinfo is not None:
+            raise _SpliceUnsafe("no date style")
+        return f'<c r="{ref}" s="{date_style.decode()}" t="n"><v>{safe_string(to_excel(value))}</v></c>'
+    raise _SpliceUnsafe(f"unsupported value type {type(value).__name__}")
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+
+def _extend_ref(ref: str, last_row: int, last_col: Optional[int] = None) -> str:
+    """A1-style range extended down to last_row (and right to last_col if given)."""
+    min_col, min_row, max_col, max_row = range_boundaries(ref)
+    max_col = max(max_col or min_col, last_col or 0)
+    max_row = max(max_row or min_row, last_row)
+    return f"{get_column_letter(min_col)}{min_row}:{get_column_letter(max_col)}{max_row}"
+
+
+def _splice_rows_into_master(master_path: str, rows, start_row: int, header_width: int,
+                             date_col: Optional[int]) -> Optional[int]:
     """
-    Normalize monthly headers from row 4 to a canonical set so later mapping works.
-    We keep the 'Monthly' label names from COLUMN_MAP keys on the DataFrame
-    (e.g., 'Prod Name', 'Amount', etc.).
+    Fast save: write the new rows as <row> XML straight into the APR sheet part
+    of the master zip and copy every other member through unchanged (VBA project,
+    other sheets, styles), instead of a full keep_vba load + wb.save.
+    Also extends the sheet dimension, AutoFilter, start-row-1 Tables and the
+    _FilterDatabase name like _expand_filters_and_tables does.
+    Returns the number of rows written, or None (nothing touched) when the
+    workbook isn't a plain append target: rows after start_row already exist,
+    the 1904 date system, unusual styles.xml, odd values, ...
+    Callers then take the openpyxl path.
     """
-    df = df.copy()
+    try:
+        with zipfile.ZipFile(master_path) as zin:
+            replaced: Dict[str, bytes] = {}
+
+            # 1900 date system only; then the APR sheet part
+            wb_part = "xl/workbook.xml"
+            wb_xml = zin.read(wb_part)
+            wb_root = ET.fromstring(wb_xml)
+            pr = wb_root.find(f"{NS_MAIN}workbookPr")
+            if pr is not None and pr.get("date1904") in ("1", "true"):
+                return None
+            located = sheet_part(zin, APR_SHEET)
+            if located is None:
+                return None
+            idx, apr_part = located
+            sheet = zin.read(apr_part)
+
+            head, sep, tail = sheet.partition(b"</sheetData>")
+            if not sep:
+                return None  # self-closing / prefixed sheetData
+            row_nums = _ROW_R_RE.findall(head)
+            if row_nums and int(row_nums[-1]) >= start_row:
+                return None  # trailing (formatted/empty) rows: openpyxl fills them in place
+
+            # new date cells get the plain cell format openpyxl gives a datetime
+            # (its default date format, default font / fill / border): reused
+            # from styles.xml when it's there, else appended
+            date_style = None
+            if date_col:
+                styles = zin.read("xl/styles.xml").decode("utf-8")
+                date_xf = ET.Element("xf", {"numFmtId": "164", "fontId": "0", "fillId": "0",
+                                            "borderId": "0", "xfId": "0"})
+                merged = add_cell_formats(styles, [date_xf], {"164": FORMAT_DATE_DATETIME})
+                if merged is None:
+                    return None
+                new_styles, (xf_id,) = merged
+                date_style = str(xf_id).encode()
+                if new_styles != styles:
+                    replaced["xl/styles.xml"] = new_styles.encode("utf-8")
+
+            letters = [get_column_letter(i) for i in range(1, header_width + 1)]
+            parts = []
+            r = start_row - 1
+            for r, row in enumerate(rows, start=start_row):
+                cells = "".join(
+                    _cell_xml(f"{letters[i]}{r}", v, date_style)
+                    for i, v in enumerate(row) if v is not None
+                )
+                if cells:
+                    parts.append(f'<row r="{r}">{cells}</row>')
+            written = r - start_row + 1
+            last_row = r
+
+            def _dimension(m):
+                return m.group(1) + _extend_ref(m.group(2).decode(), last_row, header_width).encode() + m.group(3)
+
+            sheet_filter = f"A1:{letters[-1]}{last_row}"
+            head = _DIMENSION_RE.sub(_dimension, head, count=1)
+            tail, has_filter = _AUTOFILTER_RE.subn(
+                lambda m: m.group(1) + sheet_filter.encode() + m.group(3), tail, count=1
+            )
+            replaced[apr_part] = head + "".join(parts).encode("utf-8") + sep + tail
+
+            # tables anchored on the header row grow downward (width unchanged)
+            for rel_type, part in rel_targets(zin, apr_part).values():
+                if not rel_type.endswith("/table"):
+                    continue
+                table = zin.read(part)
+                m = _TABLE_REF_RE.search(table)
+                if not m or range_boundaries(m.group(2).decode())[1] != 1:
+                    continue
+                min_col, _, max_col, _ = range_boundaries(m.group(2).decode())
+                ref = f"{get_column_letter(min_col)}1:{get_column_letter(max_col)}{last_row}".encode()
+                table = table[:m.start(2)] + ref + table[m.end(2):]
+                replaced[part] = _AUTOFILTER_RE.sub(lambda a: a.group(1) + ref + a.group(3), table, count=1)
+
+            # openpyxl mirrors the sheet AutoFilter into a hidden _FilterDatabase name
+            if has_filter:
+                wb_text = wb_xml.decode("utf-8")
+
+                def _filter_name(m):
+                    attrs = m.group(2)
+                    if 'name="_xlnm._FilterDatabase"' not in attrs or f'localSheetId="{idx}"' not in attrs:
+                        return m.group(0)
+                    sheet_name, _, old_ref = m.group(3).rpartition("!")
+                    ref = sheet_filter
+                    if "$" in old_ref:
+                        ref = "$" + ref.replace(":", ":$")
+                        ref = re.sub(r"([A-Z]+)(\d+)", r"\1$\2", ref)
+                    return m.group(1) + f"{sheet_name}!{ref}" + m.group(4)
+
+                new_wb = _DEFINED_NAME_RE.sub(_filter_name, wb_text)
+                if new_wb != wb_text:
+                    replaced[wb_part] = new_wb.encode("utf-8")
+
+            # rewrite into a temp file next to the master, then swap it in
+            tmp_path = write_zip_copy(zin, master_path, replaced)
+    except (_SpliceUnsafe, zipfile.BadZipFile, KeyError, ValueError, ET.ParseError):
+        return None
 
-    # Build a normalization of current columns -> canonical monthly labels
-    def norm(s: str) -> str:
-        return re.sub(r"\s+", " ", str(s)).strip().lower()
+    os.replace(tmp_path, master_path)  # after the reader is closed (Windows)
+    return written
 
-    # aliases (normalized) -> canonical monthly label
-    aliases = {
-        "cust name": "Cust Name",
-        "customer name": "Cust Name",
 
-        "cust type": "Cust Type",
-        "customer type": "Cust Type",
+def _find_header_col(apr_header_map: Dict[str, int], header_text: str) -> Optional[int]:
+    """Column index (1-based) of header_text in a prebuilt header map, or None."""
+    return apr_header_map.get(_norm(header_text))
 
-        "msisdn": "MSISDN",
 
-        "purchase date": "Purchase Date",
-        "date": "Purchase Date",
+def _normalize_purchase_date_column(ws, apr_header_map: Dict[str, int], last_row: int):
+    """
+    Coerce ALL 'Purchase Date' cells to true datetimes; set uniform number format.
+    The column is read in one pass and parsed vectorized (PURCHASE_DATE_FORMAT
+    fast path); only cells that actually change are written back.
+    """
+    col = _find_header_col(apr_header_map, "Purchase Date")
+    if not col or last_row < 2:
+        return
+    column = ws.iter_rows(min_row=2, max_row=last_row, min_col=col, max_col=col, values_only=True)
+    # already empty or a real datetime -> nothing to do
+    todo = [(r, v) for r, (v,) in enumerate(column, start=2) if v is not None and not isinstance(v, datetime)]
+    if not todo:
+        return
 
-        "prod name": "Prod Name",
-        "product name": "Prod Name",
+    rows = [r for r, _ in todo]
+    texts = pd.Series([str(v) for _, v in todo], index=rows, dtype=object)
+    parsed = pd.to_datetime(texts, format=PURCHASE_DATE_FORMAT, errors="coerce")
+    for r, dt in parsed.items():
+        if pd.isna(dt):
+            # other layouts: per-value parse, leave as-is if not parseable
+            try:
+                dt = pd.to_datetime(texts[r], errors="raise")
+            except Exception:
+                continue
+            if pd.isna(dt):
+                continue
+        cell = ws.cell(row=r, column=col)
+        cell.value = dt.to_pydatetime()
+        cell.number_format = "yyyy-mm-dd hh:mm:ss"
 
-        "amount": "Amount",
-        "purchase amount": "Amount",
-        "purchase amt": "Amount",
+# Treat these columns as the row identity (use only those that exist in APR headers / month df)
+DEDUPE_FIELDS = ["MSISDN", "Purchase Date", "PRODUCT_NAME", "PURCHASE_AMT", "CONTRACT_ID", "PRODUCT_ID"]
 
-        "package status": "Package Status",
-        "stat": "Package Status",
+def _key_frame(df: pd.DataFrame, fields: List[str]) -> pd.DataFrame:
+    """
+    Normalize identity fields column-wise (dates to second, amounts to float,
+    strings stripped) into an object-dtype frame with NA -> None, ready to be
+    used as merge keys. Shared by the APR scan and the monthly rows so both
+    sides normalize identically.
+    """
+    cols = {}
+    for f in fields:
+        s = df[f] if f in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if f == "Purchase Date":
+            s = _to_datetime(s).dt.floor("s")
+        elif f == "PURCHASE_AMT":
+            cleaned = s.astype(str).str.replace(_MONEY_RE, "", regex=True).str.strip()
+            num = pd.to_numeric(cleaned, errors="coerce")
+            s = num.where(num.notna(), s)  # unparseable amounts keep their raw value
+        elif s.dtype == object:
+            stripped = s.str.strip()
+            s = stripped.where(stripped.notna(), s)  # non-strings pass through
+        cols[f] = s.astype(object).where(s.notna(), None)
+    return pd.DataFrame(cols, index=df.index, columns=fields)
 
-        # collapse multiple spaces automatically; both map to same
-        "api credit type": "API Credit Type",
 
-        "prod code": "Prod Code",
-        "product id": "Prod Code",
+def _share_categories(left: pd.DataFrame, right: pd.DataFrame, cols: List[str]):
+    """
+    Cast cols on both frames to one shared CategoricalDtype so merge/duplicated
+    compare integer codes instead of hashing strings row by row.
+    """
+    left, right = left.copy(), right.copy()
+    for col in cols:
+        if col not in left.columns or col not in right.columns:
+            continue
+        values = pd.concat([left[col], right[col]], ignore_index=True).astype(object).dropna()
+        dtype = pd.CategoricalDtype(pd.unique(values))
+        left[col] = left[col].astype(object).astype(dtype)
+        right[col] = right[col].astype(object).astype(dtype)
+    return left, right
 
-        "crtr_id": "CRTR_ID",
-        "crtr id": "CRTR_ID",
-        "contract id": "CRTR_ID",
-    }
 
-    new_cols = {}
-    for c in df.columns:
-        nc = norm(c)
-        if nc in aliases:
-            new_cols[c] = aliases[nc]
-        else:
-            # keep as-is for pass-through columns we don't explicitly map
-            new_cols[c] = c
-    df = df.rename(columns=new_cols)
+def _read_existing_keys(ws) -> tuple[pd.DataFrame, int, bool]:
+    """
+    Build a frame of unique identity keys from existing APR rows using DEDUPE_FIELDS.
+    Keys are normalized (dates to second, amounts to float, strings stripped).
+    `ws` is expected to come from a read-only workbook; the sheet is loaded
+    into a DataFrame once and normalized per column.
+    Returns (keys, last_used_row, dates_ready). Key columns are the DEDUPE_FIELDS
+    present on the sheet (possibly none); last_used_row is measured over the
+    header width like _last_used_row (1 when there is no data); dates_ready is
+    True when every 'Purchase Date' cell is already empty or a real datetime,
+    i.e. _normalize_purchase_date_column would have nothing to do.
+    """
+    header_map = _build_apr_header_index(ws)
+    width = max(header_map.values(), default=0)
+
+    # which of the identity fields actually exist on the APR sheet? resolved
+    # once, as 0-based offsets into the streamed row tuples
+    cols = {f: _find_header_col(header_map, f) for f in DEDUPE_FIELDS}
+    present = [(f, col - 1) for f, col in cols.items() if col]
+    fields = [f for f, _ in present]
+    no_keys = pd.DataFrame(columns=fields, dtype=object)
+
+    # stream only the header width: it holds every key column and is all the
+    # blank-row check below looks at; cells past it are never materialized
+    data = pd.DataFrame(list(ws.iter_rows(min_row=2, max_col=width or None, values_only=True)))
+    if data.empty:
+        return no_keys, 1, True
+
+    # read-only sheets may report trailing blank rows; skip them
+    data = data[data.notna().any(axis=1)]
+    last_row = int(data.index[-1]) + 2 if len(data) else 1  # frame row 0 is sheet row 2
+
+    date_idx = (cols["Purchase Date"] or 0) - 1
+    dates_ready = date_idx not in data.columns or (
+        pd.api.types.infer_dtype(data[date_idx], skipna=True) in ("datetime", "datetime64", "empty")
+    )
+    if not present or data.empty:
+        return no_keys, last_row, dates_ready
+
+    apr = pd.DataFrame({f: data[i] if i in data.columns else None for f, i in present}, index=data.index)
+    return _key_frame(apr, fields).drop_duplicates(ignore_index=True), last_row, dates_ready
+
+
+def _read_existing_keys_from_path(master_path: str) -> tuple[pd.DataFrame, int, bool, Dict[str, int]]:
+    """
+    Open the master read-only (constant memory, no keep_vba load), scan APR and
+    close it again. Returns (keys, last_used_row, dates_ready, apr_header_map).
+    Self-contained so it can run on a worker thread next to the month read.
+    """
+    # read-only workbooks read the archive lazily: keep the map open until closed
+    with mapped(master_path) as src:
+        wb_ro = load_workbook(src, read_only=True, data_only=True)
+        try:
+            if APR_SHEET not in wb_ro.sheetnames:
+                raise RuntimeError(f"'{APR_SHEET}' sheet not found in master.")
+            ws_ro = wb_ro[APR_SHEET]
+            # the sheet's <dimension> may be stale (too small); scan to the real end
+            ws_ro.reset_dimensions()
+            apr_header_map = _build_apr_header_index(ws_ro)
+            existing_keys, last_used_row, dates_ready = _read_existing_keys(ws_ro)
+        finally:
+            wb_ro.close()
+    return existing_keys, last_used_row, dates_ready, apr_header_map
+
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize monthly headers from row 4 to a canonical set so later mapping works.
+    We keep the 'Monthly' label names from COLUMN_MAP keys on the DataFrame
+    (e.g., 'Prod Name', 'Amount', etc.). Works in place on the freshly read frame.
+    """
+    # known aliases -> canonical monthly label; pass-through columns we don't
+    # explicitly map keep their name
+    df.rename(columns={c: _ALIASES.get(_norm(c), c) for c in df.columns}, inplace=True)
 
     # Drop completely empty columns (often 'Unnamed: ...' from Excel)
-    empty_cols = [c for c in df.columns if df[c].isna().all()]
-    if empty_cols:
-        df = df.drop(columns=empty_cols)
+    df.dropna(axis=1, how="all", inplace=True)
 
     return df
 
@@ -349,9 +692,10 @@ def _coerce_and_derive(df: pd.DataFrame) -> pd.DataFrame:
     """
     df = df.copy()
 
-    # Coerce Purchase Date to datetime (keep original monthly label for mapping)
+    # Coerce Purchase Date to datetime64, truncated to the second as written to APR
+    # (keep original monthly label for mapping)
     if "Purchase Date" in df.columns:
-        df["Purchase Date"] = pd.to_datetime(df["Purchase Date"], errors="coerce")
+        df["Purchase Date"] = _to_datetime(df["Purchase Date"]).dt.floor("s")
 
     # MSISDN as string stripped (safe for leading zeros etc.)
     if "MSISDN" in df.columns:
@@ -359,13 +703,22 @@ def _coerce_and_derive(df: pd.DataFrame) -> pd.DataFrame:
         # Replace 'nan' artifacts from astype(str)
         df.loc[df["MSISDN"].str.lower().isin(["nan", "none", ""]), "MSISDN"] = pd.NA
 
-    # Amount -> numeric PURCHASE_AMT (APR-style) + keep "Amount" for mapping to APR column
+    # Amount -> float64 (written to APR as-is) + numeric PURCHASE_AMT (APR-style) for dedupe
     if "Amount" in df.columns:
-        amt = df["Amount"].astype(str).str.replace(",", "", regex=False).str.replace("$", "", regex=False).str.strip()
-        df["PURCHASE_AMT"] = pd.to_numeric(amt, errors="coerce")
+        amt = df["Amount"].astype(str).str.replace(_MONEY_RE, "", regex=True).str.strip()
+        df["Amount"] = pd.to_numeric(amt, errors="coerce").astype("float64")
+        df["PURCHASE_AMT"] = df["Amount"]
     else:
         df["PURCHASE_AMT"] = pd.NA
 
+    # Low-cardinality text -> category (stripped first; category values are written as-is)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            if df[col].dtype == object:
+                stripped = df[col].str.strip()
+                df[col] = stripped.where(stripped.notna(), df[col])
+            df[col] = df[col].astype("category")
+
     # Map monthly columns into APR-style names so dedupe has what it needs
     df["PRODUCT_NAME"] = df["Prod Name"] if "Prod Name" in df.columns else pd.NA
     df["PRODUCT_ID"] = df["Prod Code"] if "Prod Code" in df.columns else pd.NA
@@ -378,38 +731,44 @@ def _coerce_and_derive(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-# -------------------- main API (kept name/signature) --------------------
-
-def ingest_month_into_apr_bundle(master_xlsm_path: str, month_report_path: str) -> dict:
-    """
-    Append monthly columns into APR Bundle (column-by-column, no header rewrite).
-    Creates a timestamped backup before writing.
-    Returns GUI-friendly summary: rows_before / rows_added / rows_after.
-    """
-    if not os.path.isfile(master_xlsm_path):
-        raise FileNotFoundError(f"Master not found: {master_xlsm_path}")
-    if not os.path.isfile(month_report_path):
-        raise FileNotFoundError(f"Month file not found: {month_report_path}")
-
-    # Load month DF with tolerant headers and header row 4
-    month_df = _read_month_file(month_report_path)
-
-    wb = load_workbook(master_xlsm_path, keep_vba=True)
-    if APR_SHEET not in wb.sheetnames:
-        wb.close()
-        raise RuntimeError(f"'{APR_SHEET}' sheet not found in master.")
-    ws = wb[APR_SHEET]
-
-    # Build a set of existing identity keys to prevent duplicate appends
-    existing_keys = _read_existing_keys(ws)
+def _ingest_summary(master_path, backup_path, rows_before, rows_added, rows_after,
+                    duplicates_skipped, month_df, skipped_targets, resolved_map) -> dict:
+    """GUI-friendly result dict of ingest_month_into_apr_bundle (see module docstring)."""
+    return {
+        "master_backup": backup_path,
+        "updated_master": master_path,
+        "rows_before": rows_before,
+        "rows_added": rows_added,
+        "rows_after": rows_after,
+        "sheet": APR_SHEET,
+        "dedupe_skipped": duplicates_skipped,  # <-- new
+        "unmapped_monthly_columns": [c for c in COLUMN_MAP.keys() if c not in month_df.columns],
+        "unresolved_targets": skipped_targets,
+        "resolved_map": {k: get_column_letter(v) for k, v in resolved_map.items()},
+    }
 
-    # Rows before
-    last_used_before, header_width = _last_used_row(ws, from_row=2)
-    rows_before = max(0, last_used_before - 1)  # data starts at row 2
+def _unresolved_summary(master_path, backup_path, rows_before, missing_monthly, skipped_targets) -> dict:
+    """Diagnostics returned when no monthly column maps onto an APR header."""
+    return {
+        "master_backup": backup_path,
+        "updated_master": master_path,
+        "rows_before": rows_before,
+        "rows_added": 0,
+        "rows_after": rows_before,
+        "sheet": APR_SHEET,
+        "unmapped_monthly_columns": missing_monthly,
+        "unresolved_targets": skipped_targets,
+        "resolved_map": {},
+    }
 
-    # Build APR header map
-    apr_header_map = _build_apr_header_index(ws)
 
+def _plan_append(month_df: pd.DataFrame, existing_keys: pd.DataFrame, apr_header_map: Dict[str, int]):
+    """
+    Resolve the Monthly -> APR column mapping and de-duplicate the month rows
+    against the existing APR keys (and against each other).
+    Returns (resolved_map, skipped_targets, missing_monthly, new_df, duplicates_skipped);
+    new_df holds only the rows still to be written (empty when nothing resolved).
+    """
     # Resolve mapping Monthly -> APR col index
     resolved_map: Dict[str, int] = {}
     skipped_targets: Dict[str, List[str]] = {}
@@ -423,89 +782,186 @@ def ingest_month_into_apr_bundle(master_xlsm_path: str, month_report_path: str)
             skipped_targets[monthly_label] = targets
         else:
             resolved_map[monthly_label] = col_idx
+    if not resolved_map:
+        return resolved_map, skipped_targets, missing_monthly, month_df.iloc[0:0], 0
+
+    # De-duplicate in one vectorized pass: a left hash-join against the APR keys
+    # finds rows already present, duplicated() finds repeats within the month
+    # file (only rows that carry mapped values count as repeats)
+    key_fields = list(existing_keys.columns) or DEDUPE_FIELDS
+    month_keys = _key_frame(month_df, key_fields)
+    month_keys, existing_keys = _share_categories(month_keys, existing_keys, CATEGORY_KEY_FIELDS)
+    if existing_keys.empty:
+        in_apr = pd.Series(False, index=month_df.index)
+    else:
+        joined = month_keys.merge(existing_keys, on=key_fields, how="left", indicator=True)
+        in_apr = pd.Series(joined["_merge"].eq("both").to_numpy(), index=month_df.index)
+    has_any = month_df[list(resolved_map)].notna().any(axis=1)
+    in_file_dup = month_keys[has_any].duplicated().reindex(month_df.index, fill_value=False)
+    is_dup = in_apr | in_file_dup
+    duplicates_skipped = int(is_dup.sum())
+    new_df = month_df[~is_dup & has_any]  # rows with nothing to write are dropped too
+    return resolved_map, skipped_targets, missing_monthly, new_df, duplicates_skipped
+
+
+def _apr_rows(col_arrays: List[list], target_idx: List[int], header_width: int):
+    """Assemble each row as a full-width list (unmapped columns stay None)."""
+    for values in zip(*col_arrays):
+        row = [None] * header_width
+        for i, val in zip(target_idx, values):
+            row[i] = val
+        yield row
+
+
+def _append_into_sheet(ws, apr_header_map: Dict[str, int], col_arrays: List[list],
+                       target_idx: List[int], header_width: int) -> tuple[int, int]:
+    """
+    openpyxl write path on a loaded APR sheet: append the rows after the last
+    used row, expand AutoFilter/Tables and normalize the dates column.
+    Returns (last_used_before, rows_written).
+    """
+    # Last used row on the writable sheet (computed once; the helpers below reuse
+    # it instead of rescanning). First empty row after current data is the start.
+    last_used_before, header_width = _last_used_row(ws, from_row=2, to_col=header_width)
+
+    written = _append_rows(ws, last_used_before + 1, _apr_rows(col_arrays, target_idx, header_width))
+
+    # Expand table & autofilter; normalize dates column for correct sort
+    _expand_filters_and_tables(ws, last_used_before + written, header_width)
+    _normalize_purchase_date_column(ws, apr_header_map, last_used_before + written)
+    return last_used_before, written
+
+
+# -------------------- main API (kept name/signature) --------------------
+
+def ingest_month_into_apr_bundle(master_xlsm_path: str, month_report_path: str,
+                                 do_backup: bool = True, reader_engine: Optional[str] = None) -> dict:
+    """
+    Append monthly columns into APR Bundle (column-by-column, no header rewrite).
+    Creates a timestamped backup before writing (do_backup=False when the caller
+    already made one; master_backup is then None).
+    reader_engine: optional pd.read_excel engine for the month report (see _read_month_file).
+    Returns GUI-friendly summary: rows_before / rows_added / rows_after.
+    """
+    if not os.path.isfile(master_xlsm_path):
+        raise FileNotFoundError(f"Master not found: {master_xlsm_path}")
+    if not os.path.isfile(month_report_path):
+        raise FileNotFoundError(f"Month file not found: {month_report_path}")
+
+    # Two independent reads, run concurrently:
+    #  - month DF with tolerant headers and header row 4
+    #  - one read-only scan of APR: identity keys to prevent duplicate appends,
+    #    header map, row count
+    # Everything up to the dedupe runs on these; the heavy mutating load below
+    # only happens when there is actually something to write.
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_apr = ex.submit(_read_existing_keys_from_path, master_xlsm_path)
+        fut_month = ex.submit(_read_month_file, month_report_path, reader_engine)
+        month_df = fut_month.result()
+        existing_keys, last_used_ro, dates_ready, apr_header_map = fut_apr.result()
+    rows_before = max(0, last_used_ro - 1)  # data starts at row 2
+
+    resolved_map, skipped_targets, missing_monthly, new_df, duplicates_skipped = _plan_append(
+        month_df, existing_keys, apr_header_map
+    )
 
     # If nothing resolved, still make a safe backup and return diagnostics
-    backup_path = _backup_master(master_xlsm_path)
+    backup_path = _backup_master(master_xlsm_path) if do_backup else None
 
     if not resolved_map:
-        wb.close()
-        return {
-            "master_backup": backup_path,
-            "updated_master": master_xlsm_path,
-            "rows_before": rows_before,
-            "rows_added": 0,
-            "rows_after": rows_before,
-            "sheet": APR_SHEET,
-            "unmapped_monthly_columns": missing_monthly,
-            "unresolved_targets": skipped_targets,
-            "resolved_map": {},
-        }
-
-    # First empty row after current data
-    start_row = last_used_before + 1
-
-    # Append values cell-by-cell with de-duplication
-    n_rows = len(month_df)
-    written = 0
-    duplicates_skipped = 0
-
-    for i in range(n_rows):
-        # Build key for the current monthly row (uses any matching DEDUPE_FIELDS present)
-        row_key = _make_row_key(month_df.iloc[i])
-        if row_key in existing_keys:
-            duplicates_skipped += 1
-            continue  # skip duplicates already in APR
-
-        target_row = start_row + written  # compact placement (no gaps)
-        row_has_any = False
-        for m_col, col_idx in resolved_map.items():
-            val = _coerce_for_excel(month_df.iloc[i][m_col])
-
-            # Amount -> numeric if possible
-            if m_col == "Amount" and isinstance(val, str):
-                val = re.sub(r"[,$]", "", val).strip()
-                try:
-                    val = float(val)
-                except Exception:
-                    pass
-
-            # Purchase Date -> real datetime
-            if m_col == "Purchase Date":
-                val = pd.to_datetime(val, errors="coerce")
-                val = None if pd.isna(val) else val.to_pydatetime().replace(microsecond=0)
-
-            if val is not None:
-                row_has_any = True
-            ws.cell(row=target_row, column=col_idx, value=val)
-
-        if row_has_any:
-            written += 1
-            existing_keys.add(row_key)  # also prevents in-file duplicates
+        return _unresolved_summary(
+            master_xlsm_path, backup_path, rows_before, missing_monthly, skipped_targets
+        )
 
-    # Expand table & autofilter; normalize dates column for correct sort
-    _expand_filters_and_tables(ws)
-    _normalize_purchase_date_column(ws)
+    # Empty month file or every row already present: nothing to write, so skip
+    # loading/saving the master entirely
+    if new_df.empty:
+        return _ingest_summary(
+            master_xlsm_path, backup_path, rows_before, 0, rows_before,
+            duplicates_skipped, month_df, skipped_targets, resolved_map,
+        )
 
-    wb.save(master_xlsm_path)
-    wb.close()
+    # Coerce each mapped column once up front; the row assembly only indexes
+    # plain lists. Rows are appended in one pass, compact placement (no gaps).
+    col_arrays = [_coerce_for_excel(new_df[m_col]) for m_col in resolved_map]
+    header_width = max(apr_header_map.values())
+    target_idx = [col_idx - 1 for col_idx in resolved_map.values()]
+
+    # Fast path: splice the new rows into the sheet XML inside the zip, leaving
+    # the rest of the workbook byte-for-byte. Only when the existing dates need
+    # no normalization (that rewrites old cells); otherwise, or when the splice
+    # declines, fall back to the full openpyxl load/save below.
+    last_used_before = last_used_ro
+    written = None
+    if dates_ready:
+        written = _splice_rows_into_master(
+            master_xlsm_path, _apr_rows(col_arrays, target_idx, header_width),
+            last_used_before + 1, header_width,
+            _find_header_col(apr_header_map, "Purchase Date"),
+        )
+
+    if written is None:
+        with mapped(master_xlsm_path) as src:  # fully read here; unmapped before the save
+            wb = load_workbook(src, keep_vba=True)
+        last_used_before, written = _append_into_sheet(
+            wb[APR_SHEET], apr_header_map, col_arrays, target_idx, header_width
+        )
+        rows_before = max(0, last_used_before - 1)
+        wb.save(master_xlsm_path)
+        wb.close()
+
+    # Appended rows are compact, so the new last row follows from the count
+    last_used_after = last_used_before + written
 
     # Rows after
-    last_used_after, _ = _last_used_row(ws, from_row=2)
     rows_after = max(0, last_used_after - 1)
-    rows_added = written
 
-    return {
-        "master_backup": backup_path,
-        "updated_master": master_xlsm_path,
-        "rows_before": rows_before,
-        "rows_added": rows_added,
-        "rows_after": rows_after,
-        "sheet": APR_SHEET,
-        "dedupe_skipped": duplicates_skipped,  # <-- new
-        "unmapped_monthly_columns": [c for c in COLUMN_MAP.keys() if c not in month_df.columns],
-        "unresolved_targets": skipped_targets,
-        "resolved_map": {k: get_column_letter(v) for k, v in resolved_map.items()}, 
-        }
+    return _ingest_summary(
+        master_xlsm_path, backup_path, rows_before, written, rows_after,
+        duplicates_skipped, month_df, skipped_targets, resolved_map,
+    )
+
+
+def ingest_month_into_apr_bundle_wb(wb, month_report_path: str, master_xlsm_path: Optional[str] = None,
+                                    backup_path: Optional[str] = None,
+                                    reader_engine: Optional[str] = None) -> dict:
+    """
+    Same ingest on an already loaded (keep_vba) master Workbook: the APR sheet
+    is scanned and appended to in memory; the caller saves (and backs up).
+    master_xlsm_path / backup_path are only reported in the summary.
+    """
+    if not os.path.isfile(month_report_path):
+        raise FileNotFoundError(f"Month file not found: {month_report_path}")
+    if APR_SHEET not in wb.sheetnames:
+        raise RuntimeError(f"'{APR_SHEET}' sheet not found in master.")
+    ws = wb[APR_SHEET]
+
+    month_df = _read_month_file(month_report_path, reader_engine)
+    apr_header_map = _build_apr_header_index(ws)
+    existing_keys, last_used_before, _ = _read_existing_keys(ws)
+    rows_before = max(0, last_used_before - 1)  # data starts at row 2
+
+    resolved_map, skipped_targets, missing_monthly, new_df, duplicates_skipped = _plan_append(
+        month_df, existing_keys, apr_header_map
+    )
+    if not resolved_map:
+        return _unresolved_summary(
+            master_xlsm_path, backup_path, rows_before, missing_monthly, skipped_targets
+        )
+
+    written = 0
+    if not new_df.empty:
+        col_arrays = [_coerce_for_excel(new_df[m_col]) for m_col in resolved_map]
+        target_idx = [col_idx - 1 for col_idx in resolved_map.values()]
+        last_used_before, written = _append_into_sheet(
+            ws, apr_header_map, col_arrays, target_idx, max(apr_header_map.values())
+        )
+        rows_before = max(0, last_used_before - 1)
+
+    return _ingest_summary(
+        master_xlsm_path, backup_path, rows_before, written, rows_before + written,
+        duplicates_skipped, month_df, skipped_targets, resolved_map,
+    )
 
 
 # ------------- CLI -------------
@@ -1,50 +1,24 @@
-def process_excel_file(excel_path):
-    import sys
-    import os
-    import tkinter as tk
-    from tkinter import filedialog
+def _build_final(APR_dataframe, Molo_dataframe):
+    # APR Bundle + Molo Molo frames -> Molo Molo Auto table (and its months)
     import pandas as pd
-    import openpyxl 
-    from openpyxl.utils.dataframe import dataframe_to_rows
-    from openpyxl.styles import Alignment
-    from openpyxl.utils import get_column_letter
-    import shutil
-    from datetime import datetime
-
-    #use MoloMolo MSISDN to identify data from raw data
-    #use APR Bundle with MSISDN to calculate data to add to 3rd sheet
-
-    #load excel file
-    # `excel_path` will be injected from GUI wrapper
-    # Ensure it's declared at the top if needed:
-    # excel_path = ""
-    APR_dataframe = pd.read_excel(excel_path, sheet_name='APR Bundle')
-    Molo_dataframe = pd.read_excel(excel_path, sheet_name='Molo Molo')
-    print(Molo_dataframe[["Name"]].head(10))
-
-    #Backup 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_dir = os.path.dirname(excel_path)
-    backup_path = os.path.join(backup_dir, f"Comission_calculations_Backup_{timestamp}.xlsm")
-    shutil.copyfile(excel_path, backup_path)
-    print(f"backup created: {backup_path}")
 
     #Prepare MSISDNs
     Molo_MSISDNs = Molo_dataframe[["MSISDN", "Reg Date"]].dropna(subset=['MSISDN']).drop_duplicates()
     valid_MSISDNs = Molo_MSISDNs["MSISDN"].unique()
 
-    #Count purchases and total ammount of topup
-    grouped = APR_dataframe.groupby("MSISDN")["PURCHASE_AMT"].agg(["count", "sum"]).reset_index()
-    grouped.columns = ["MSISDN", "TOPUP COUNT", "TOPUP AMOUNT"]
+    #Encisia-credited ammounts as their own column (0 elsewhere), so the encisia
+    #sums come out of the same groupby passes as the topup totals
+    APR_dataframe["ENCISIA_AMT"] = APR_dataframe["PURCHASE_AMT"].where(
+        APR_dataframe["API  Credit Type"] == "encisia", 0)
 
-    #Sum Ecesia-credited ammounts
-    encisia_dataframe = APR_dataframe[APR_dataframe["API  Credit Type"] == "encisia"]
-    encisia_sum = encisia_dataframe.groupby("MSISDN")["PURCHASE_AMT"].sum().reset_index()
-    encisia_sum.columns = ["MSISDN", "ENCISIA"]
+    #Count purchases, total ammount of topup and Ecesia-credited sum in one pass
+    combined = APR_dataframe.groupby("MSISDN").agg(**{
+        "TOPUP COUNT": ("PURCHASE_AMT", "count"),
+        "TOPUP AMOUNT": ("PURCHASE_AMT", "sum"),
+        "ENCISIA": ("ENCISIA_AMT", "sum"),
+    }).reset_index()
 
     #Compute HQ
-    combined = pd.merge(grouped, encisia_sum, on="MSISDN", how="left")
-    combined["ENCISIA"] = combined["ENCISIA"].fillna(0)
     combined["HQ"] = combined["TOPUP AMOUNT"] - combined["ENCISIA"]
 
     #Names
@@ -67,17 +41,11 @@ def process_excel_file(excel_path):
     available_months = sorted(APR_filtered["Month"].unique())
 
     monthly_summary = (
-        APR_filtered.groupby(["MSISDN", "Month"])["PURCHASE_AMT"]
-        .agg(["sum", "count"])
+        APR_filtered.groupby(["MSISDN", "Month"])
+        .agg(sum=("PURCHASE_AMT", "sum"), count=("PURCHASE_AMT", "count"), ENCISIA=("ENCISIA_AMT", "sum"))
         .reset_index()
     )
 
-    monthly_encisia = APR_filtered[APR_filtered["API  Credit Type"] == "encisia"]
-    monthly_encisia = monthly_encisia.groupby(["MSISDN", "Month"])["PURCHASE_AMT"].sum().reset_index()
-    monthly_encisia.columns = ["MSISDN", "Month", "ENCISIA"]
-
-    monthly_summary = pd.merge(monthly_summary, monthly_encisia, on=["MSISDN", "Month"], how="left")
-    monthly_summary["ENCISIA"] = monthly_summary["ENCISIA"].fillna(0)
     monthly_summary["HQ"] = monthly_summary["sum"] - monthly_summary["ENCISIA"]
 
     metrics_order = ['sum', 'count', 'ENCISIA', 'HQ']
@@ -99,47 +67,40 @@ def process_excel_file(excel_path):
     static_columns = ["MSISDN", "CUSTOMER_NAME", "Reg Date", "TOPUP COUNT", "TOPUP AMOUNT", "ENCISIA", "HQ", "DATA Type"]
     monthly_columns = [col for col in final.columns if col not in static_columns]
 
+    # Parse every "<Month> <Year>" prefix in one call; unparseable/short names sort first
+    no_month = pd.to_datetime('1900-01')
+    month_keys = [' '.join(col.split()[:2]) for col in monthly_columns]
+    parsed_months = pd.to_datetime(month_keys, format="%B %Y", errors="coerce")
+    months_parsed = {col: (no_month if pd.isna(month) else month)
+                     for col, month in zip(monthly_columns, parsed_months)}
+    metric_rank = {metric.lower(): i for i, metric in enumerate(metrics_order)}
+
     def sort_monthly_columns(col):
         parts = col.split()
         if len(parts) >= 3:
-            month_str = ' '.join(parts[:2])
             metric = ' '.join(parts[2:]).lower()  # Convert metric to lowercase
-            try:
-                return (pd.to_datetime(month_str), metrics_order.index(metric))
-            except ValueError:
-                # If metric not found, place it at the end
-                return (pd.to_datetime(month_str), len(metrics_order))
-        return (pd.to_datetime('1900-01'), 0)
+            # If metric not found, place it at the end
+            return (months_parsed[col], metric_rank.get(metric, len(metrics_order)))
+        return (no_month, 0)
 
     monthly_columns_sorted = sorted(monthly_columns, key=sort_monthly_columns)
 
     final = final[static_columns + monthly_columns_sorted]
 
+    return final, available_months
 
-    #Writing Molo Molo Auto
-    wb = openpyxl.load_workbook(excel_path, keep_vba=True)
-    if "Molo Molo Auto" in wb.sheetnames:
-        del wb["Molo Molo Auto"]
-    ws = wb.create_sheet("Molo Molo Auto")
 
-    ws.freeze_panes = 'A3'
+def _molo_header_layout(final, available_months):
+    # Two header rows for Molo Molo Auto: month names merged over their metrics
+    # (centered), other columns merged over both rows.
+    # Returns (row1, row2, merges, centered); merges are (first col, last col, last row)
+    # and unwritten header cells stay None
+    n = len(final.columns)
+    row1 = [None] * n
+    row2 = [None] * n
+    merges = []
+    centered = set()
 
-    #preparing headers
-    main_headers = []
-    sub_headers = []
-    for col in final.columns:
-        if any(month.strftime("%B %Y") in col for month in available_months):
-            parts = col.split(" ")
-            main = " ".join(parts[:2])
-            sub = " ".join(parts[2:])
-            main_headers.append(main)
-            sub_headers.append(sub)
-        else:
-            main_headers.append(col)
-            sub_headers.append("")
-
-
-    # Writing headers
     col_index = 1
     current_month = None
     month_start_col = 1
@@ -153,63 +114,239 @@ def process_excel_file(excel_path):
             if month_name != current_month:
                 # New month - finish previous month's header if exists
                 if current_month is not None:
-                    ws.merge_cells(start_row=1, start_column=month_start_col, 
-                                end_row=1, end_column=col_index-1)
-                    ws.cell(row=1, column=month_start_col, 
-                        value=current_month).alignment = Alignment(horizontal="center")
+                    merges.append((month_start_col, col_index-1, 1))
+                    row1[month_start_col-1] = current_month
+                    centered.add(month_start_col)
                 
                 # Start new month
                 current_month = month_name
                 month_start_col = col_index
             
             # Write subheader
-            ws.cell(row=2, column=col_index, value=metric)
+            row2[col_index-1] = metric
             col_index += 1
         else:
             # Non-monthly column
             if current_month is not None:
                 # Finish the current month header
-                ws.merge_cells(start_row=1, start_column=month_start_col, 
-                            end_row=1, end_column=col_index-1)
-                ws.cell(row=1, column=month_start_col, 
-                    value=current_month).alignment = Alignment(horizontal="center")
+                merges.append((month_start_col, col_index-1, 1))
+                row1[month_start_col-1] = current_month
+                centered.add(month_start_col)
                 current_month = None
             
             # Write regular header
-            ws.merge_cells(start_row=1, start_column=col_index, 
-                        end_row=2, end_column=col_index)
-            ws.cell(row=1, column=col_index, value=col)
+            merges.append((col_index, col_index, 2))
+            row1[col_index-1] = col
             col_index += 1
 
     # Finish any remaining month header
     if current_month is not None:
-        ws.merge_cells(start_row=1, start_column=month_start_col, 
-                    end_row=1, end_column=col_index-1)
-        ws.cell(row=1, column=month_start_col, 
-            value=current_month).alignment = Alignment(horizontal="center")
+        merges.append((month_start_col, col_index-1, 1))
+        row1[month_start_col-1] = current_month
+        centered.add(month_start_col)
+
+    return row1, row2, merges, centered
+
+
+def _molo_column_widths(final, row1, row2):
+    # Column widths from the DataFrame instead of rescanning every written cell
+    # (merged/empty header cells count as "None")
+    widths = []
+    for col_index in range(1, len(final.columns) + 1):
+        values = final.iloc[:, col_index - 1]
+        max_length = max(len(str(row1[col_index - 1])), len(str(row2[col_index - 1])),
+                         int(values.map(str).str.len().max()) if len(values) else 0)
+        widths.append(max_length + 2)
+    return widths
+
+
+def _write_molo_molo_auto(wb, final, available_months):
+    # (Re)create the Molo Molo Auto sheet in an open workbook; the caller saves
+    from openpyxl.styles import Alignment
+    from openpyxl.utils import get_column_letter
 
-    # Writing data 
-    for row_index, row in final.iterrows():
+    #Writing Molo Molo Auto
+    if "Molo Molo Auto" in wb.sheetnames:
+        del wb["Molo Molo Auto"]
+    ws = wb.create_sheet("Molo Molo Auto")
+
+    ws.freeze_panes = 'A3'
+
+    # Writing headers
+    row1, row2, merges, centered = _molo_header_layout(final, available_months)
+    for first_col, last_col, last_row in merges:
+        ws.merge_cells(start_row=1, start_column=first_col, end_row=last_row, end_column=last_col)
+    for col_index, value in enumerate(row1, start=1):
+        if value is not None:
+            cell = ws.cell(row=1, column=col_index, value=value)
+            if col_index in centered:
+                cell.alignment = Alignment(horizontal="center")
+    for col_index, value in enumerate(row2, start=1):
+        if value is not None:
+            ws.cell(row=2, column=col_index, value=value)
+
+    # Writing data (rows 3+). Explicit rows rather than ws.append: with no month
+    # columns row 2 only holds merged cells, which don't move append's cursor
+    for row_index, row in enumerate(final.to_numpy().tolist(), start=3):
         for col_index, val in enumerate(row, 1):
-            ws.cell(row=row_index + 3, column=col_index, value=val)
-
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column_letter].width = adjusted_width
-
-    #save file
-    wb.save(excel_path)
+            ws.cell(row=row_index, column=col_index, value=val)
+
+    for col_index, width in enumerate(_molo_column_widths(final, row1, row2), start=1):
+        ws.column_dimensions[get_column_letter(col_index)].width = width
+
+
+def _write_molo_molo_auto_fast(excel_path, final, available_months):
+    # Fast save (values-only): build Molo Molo Auto in a write-only workbook
+    # (no per-cell Cell/style objects) and splice its sheet XML over the existing
+    # Molo Molo Auto part of the master zip; every other part is copied as is.
+    # Header alignment and dates keep their number format / alignment, fonts
+    # fall back to the master's default font.
+    # Returns False (master untouched) when the sheet can't simply be swapped:
+    # no Molo Molo Auto yet or it isn't the last tab, the old sheet has its own
+    # rels (comments, drawings, tables), a calcChain, unusual styles.xml, ... The caller then uses openpyxl.
+    import io
+    import os
+    import re
+    import zipfile
+    import xml.etree.ElementTree as ET
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.cell_range import CellRange
+    from PiramieExcelMaker_ooxml import (NS_MAIN, STYLE_RE, add_cell_formats, rels_path, sheet_count,
+                                         sheet_part, write_zip_copy)
+
+    #Writing Molo Molo Auto into a write-only workbook
+    row1, row2, merges, centered = _molo_header_layout(final, available_months)
+    wo = openpyxl.Workbook(write_only=True)
+    ws = wo.create_sheet("Molo Molo Auto")
+    ws.freeze_panes = 'A3'
+    for col_index, width in enumerate(_molo_column_widths(final, row1, row2), start=1):
+        ws.column_dimensions[get_column_letter(col_index)].width = width  # before any row
+    for first_col, last_col, last_row in merges:
+        ws.merged_cells.add(CellRange(min_col=first_col, min_row=1, max_col=last_col, max_row=last_row))
+
+    header = []
+    for col_index, value in enumerate(row1, start=1):
+        if col_index in centered:
+            value = WriteOnlyCell(ws, value=value)
+            value.alignment = Alignment(horizontal="center")
+        header.append(value)
+    ws.append(header)
+    ws.append(row2)
+    for row in final.to_numpy().tolist():
+        ws.append(tuple(row))
+
+    buf = io.BytesIO()
+    wo.save(buf)
+    with zipfile.ZipFile(buf) as zwo:
+        new_sheet = zwo.read("xl/worksheets/sheet1.xml")
+        wo_styles = ET.fromstring(zwo.read("xl/styles.xml"))
+
+    try:
+        with zipfile.ZipFile(excel_path) as zin:
+            names = set(zin.namelist())
+            located = sheet_part(zin, "Molo Molo Auto")
+            #openpyxl recreates the sheet as the last tab; only swap it in place there
+            if located is None or located[0] != sheet_count(zin) - 1 or "xl/calcChain.xml" in names:
+                return False
+            molo_part = located[1]
+            if molo_part not in names or rels_path(molo_part) in names:
+                return False
+
+            #write-only cell formats -> the same xf in the master's cellXfs, or appended
+            #there (xf 0 stays 0)
+            wo_fmts = {fmt.get("numFmtId"): fmt.get("formatCode") for fmt in wo_styles.iter(f"{NS_MAIN}numFmt")}
+            merged = add_cell_formats(zin.read("xl/styles.xml").decode("utf-8"),
+                                      list(wo_styles.find(f"{NS_MAIN}cellXfs"))[1:], wo_fmts)
+            if merged is None:
+                return False
+            styles, xf_ids = merged
+            style_map = {b"0": b"0"}
+            for i, xf_id in enumerate(xf_ids, start=1):
+                style_map[str(i).encode()] = str(xf_id).encode()
+
+            #the write-only sheet is its workbook's selected tab; the master keeps its own
+            new_sheet = re.sub(rb'\s+tabSelected="(1|true)"', b"", new_sheet)
+            new_sheet = STYLE_RE.sub(lambda m: b's="' + style_map[m.group(1)] + b'"', new_sheet)
+
+            tmp_path = write_zip_copy(zin, excel_path, {
+                molo_part: new_sheet,
+                "xl/styles.xml": styles.encode("utf-8"),
+            })
+    except (zipfile.BadZipFile, KeyError, ValueError, ET.ParseError):
+        return False
+
+    os.replace(tmp_path, excel_path)  # after the reader is closed (Windows)
+    return True
+
+
+def process_excel_file(excel_path, fast_save=False):
+    import sys
+    import os
+    import tkinter as tk
+    from tkinter import filedialog
+    import pandas as pd
+    import openpyxl 
+    from openpyxl.utils.dataframe import dataframe_to_rows
+    import shutil
+    from datetime import datetime
+    from PiramieExcelMaker_ooxml import mapped
+
+    #use MoloMolo MSISDN to identify data from raw data
+    #use APR Bundle with MSISDN to calculate data to add to 3rd sheet
+
+    #load excel file
+    # `excel_path` will be injected from GUI wrapper
+    # Ensure it's declared at the top if needed:
+    # excel_path = ""
+    # one read_excel call: the workbook is opened and parsed once for both sheets
+    # (over a read-only memory map of the file)
+    with mapped(excel_path) as src:
+        sheets = pd.read_excel(src, sheet_name=['APR Bundle', 'Molo Molo'])
+    APR_dataframe = sheets['APR Bundle']
+    Molo_dataframe = sheets['Molo Molo']
+    print(Molo_dataframe[["Name"]].head(10))
+
+    #Backup 
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup_dir = os.path.dirname(excel_path)
+    backup_path = os.path.join(backup_dir, f"Comission_calculations_Backup_{timestamp}.xlsm")
+    shutil.copyfile(excel_path, backup_path)
+    print(f"backup created: {backup_path}")
+
+    final, available_months = _build_final(APR_dataframe, Molo_dataframe)
+
+    #Writing Molo Molo Auto (fast save: write-only sheet swapped into the zip,
+    #openpyxl round trip of the whole master otherwise or when it can't be swapped)
+    if not (fast_save and _write_molo_molo_auto_fast(excel_path, final, available_months)):
+        with mapped(excel_path) as src:  # fully read here; unmapped before the save
+            wb = openpyxl.load_workbook(src, keep_vba=True)
+        _write_molo_molo_auto(wb, final, available_months)
+
+        #save file
+        wb.save(excel_path)
 
     print(f"Molo Molo Auto sheet generated: {excel_path}")
 
+
+def process_excel_file_wb(wb):
+    # Same as process_excel_file on an already loaded (keep_vba) workbook, e.g.
+    # right after an in-memory ingest: the frames are read from the live sheets
+    # (stored values, read_excel's parsing rules) and Molo Molo Auto is rebuilt
+    # in place. No backup and no save here; the caller does both once.
+    # Formula cells would be read as their formula text (the workbook isn't
+    # data_only), so callers check for formulas first (see run_pipeline).
+    import pandas as pd
+
+    sheets = pd.read_excel(wb, sheet_name=['APR Bundle', 'Molo Molo'], engine="openpyxl")
+    APR_dataframe = sheets['APR Bundle']
+    Molo_dataframe = sheets['Molo Molo']
+
+    final, available_months = _build_final(APR_dataframe, Molo_dataframe)
+    _write_molo_molo_auto(wb, final, available_months)
+
 if __name__ == "__main__":
     # test/debug mode
     process_excel_file("Commission_Calculations_April_2025_Gaetan.xlsm")
\ No newline at end of file
@@ -6,20 +6,37 @@ Drag-and-drop (or file-picker fallback) GUI with two flows:
   A) Run Core Only:
      - Requires MASTER (.xlsm) only
      - Calls process_excel_file(MASTER)
+     - "Fast save (values-only)": Molo Molo Auto is written in openpyxl's
+       write-only mode and swapped into the file instead of a full re-save
 
   B) Ingest + Core:
      - Requires MASTER (.xlsm) + MONTH report (.xlsx/.xls)
      - Calls ingest_month_into_apr_bundle(MASTER, MONTH)  [creates backup]
      - Then calls process_excel_file(MASTER)
+     - Both run in a spawned child process (PiramieExcelMaker_workers.run_pipeline)
+     - Fast save on (default): the two steps run one after the other, each
+       splicing its changes into the file (chunked rows / write-only sheet).
+       Fast save off: the master is loaded once, updated by both steps and
+       saved once with openpyxl. The two modes are mutually exclusive; fast
+       save is the default because neither step then does a full openpyxl save
 
 Dependencies:
-  pip install pandas openpyxl tkinterdnd2  (tkinterdnd2 is optional)
+  pip install pandas openpyxl tkinterdnd2 python-calamine
+  (tkinterdnd2 and python-calamine are optional)
 """
 
+import collections
+import importlib.util
+import multiprocessing as mp
 import os
+import queue
+import stat
 import sys
+import threading
 import traceback
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from tkinter import ttk, filedialog, messagebox
 
 # Optional drag & drop
@@ -29,10 +46,17 @@ try:
 except Exception:
     DND_AVAILABLE = False
 
-# 1) Monthly ingest (appends/normalizes APR Bundle + backup)
-from PiramieExcelMaker_append import ingest_month_into_apr_bundle
-# 2) Your existing core (builds Molo Molo Auto etc.)
-from PiramieExcelMaker_core import process_excel_file
+# Optional Rust-backed reader for the month report (pip install python-calamine);
+# the ingest's openpyxl streaming read is used otherwise. Only looked up here,
+# the child process imports it when it reads the report
+MONTH_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+# 1) Your existing core (builds Molo Molo Auto etc.); Core Only runs it in-process.
+#    Imported on first use, on the worker thread (see App._lazy_import); it
+#    pulls in pandas/openpyxl there, after the window is up
+# 2) Child-process entry point: monthly ingest (appends/normalizes APR Bundle +
+#    backup), then core. Light (no pandas at import); the pool needs it by name
+from PiramieExcelMaker_workers import init_worker, run_pipeline
 
 
 class DropZone(ttk.Frame):
@@ -56,8 +80,7 @@ class DropZone(ttk.Frame):
             title="Select file",
             filetypes=self.filetypes or [("All files", "*.*")],
         )
-        if path:
-            self.on_file_selected(path)
+        if path and self.on_file_selected(path):
             self.label.configure(text=os.path.basename(path))
 
     def _on_drop(self, event):
@@ -66,8 +89,9 @@ class DropZone(ttk.Frame):
         if raw.startswith("{") and raw.endswith("}"):
             raw = raw[1:-1]
         path = raw.split()[0]
-        if os.path.isfile(path):
-            self.on_file_selected(path)
+        # no isfile() here: the handler stats the path once and says whether
+        # it took it (see App._set_master); only then does the label change
+        if self.on_file_selected(path):
             self.label.configure(text=os.path.basename(path))
 
 
@@ -81,8 +105,30 @@ class App(TkinterDnD.Tk if DND_AVAILABLE else tk.Tk):
         # State
         self.master_path = None       # .xlsm
         self.month_report_path = None # .xlsx/.xls
+        # os.stat of each selection, taken once when it's picked; the run
+        # buttons check these instead of stat-ing again (slow on network drives)
+        self._master_stat = None
+        self._month_stat = None
+        self._process_excel_file = None  # core entry point, see _lazy_import
+        # (cancel flag, thread) of the running page-cache prewarm, per slot (see _prewarm)
+        self._prewarm_jobs = {"master": None, "month": None}
+
+        # Heavy Excel work runs on one background thread (Core Only) or in a
+        # child process (Ingest + Core); the Tk thread only drains log lines and
+        # picks up the finished job (see _drain_log)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # log lines from any thread; the oldest are dropped if the UI ever
+        # falls this far behind
+        self._log_buf = collections.deque(maxlen=5000)
+        self._log_pending = False  # an after_idle flush is already scheduled
+        self._job = None  # (future, label, success message or None)
+        # spawned lazily on the first Ingest + Core and kept alive across runs
+        # to amortize interpreter startup; its progress lines arrive here
+        self._pool = None
+        self._progress_queue = None
 
         self._build_ui()
+        self.after(50, self._drain_log)
 
     def _build_ui(self):
         # Title
@@ -129,6 +175,13 @@ class App(TkinterDnD.Tk if DND_AVAILABLE else tk.Tk):
         self.btn_ingest_core = ttk.Button(action_bar, text="Ingest + Core", command=self._run_ingest_then_core)
         self.btn_ingest_core.pack(side="left")
 
+        # on by default on purpose: with it, Ingest + Core runs its two steps
+        # with file-level fast saves instead of the single load/save (the two
+        # are mutually exclusive, see the module docstring)
+        self.fast_save = tk.BooleanVar(value=True)
+        self.chk_fast_save = ttk.Checkbutton(action_bar, text="Fast save (values-only)", variable=self.fast_save)
+        self.chk_fast_save.pack(side="left", padx=(16, 0))
+
         self.btn_quit = ttk.Button(action_bar, text="Quit", command=self.destroy)
         self.btn_quit.pack(side="right")
 
@@ -136,76 +189,226 @@ class App(TkinterDnD.Tk if DND_AVAILABLE else tk.Tk):
         self.text = tk.Text(self, height=16, wrap="word", state="disabled")
         self.text.pack(fill="both", expand=False, padx=16, pady=(0, 16))
 
+    def destroy(self):
+        # a running job is left to finish (it may be mid-save); nothing new starts
+        for job in self._prewarm_jobs.values():
+            if job is not None:
+                job[0].set()
+        self._executor.shutdown(wait=False)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        super().destroy()
+
     def _log(self, msg: str):
-        self.text.configure(state="normal")
-        self.text.insert("end", msg + "\n")
-        self.text.see("end")
-        self.text.configure(state="disabled")
-        self.update_idletasks()
+        # safe from any thread (deque appends are atomic). Lines logged on the
+        # Tk thread are flushed once it's idle; worker lines by the _drain_log poll
+        # (Tk calls like after_idle must stay on the Tk thread)
+        self._log_buf.append(msg + "\n")
+        if not self._log_pending and threading.current_thread() is threading.main_thread():
+            self._log_pending = True
+            self.after_idle(self._flush_log)
+
+    def _flush_log(self):
+        # everything buffered so far goes in with one insert / one redraw
+        self._log_pending = False
+        batch = []
+        while True:
+            try:
+                batch.append(self._log_buf.popleft())
+            except IndexError:
+                break
+        while self._progress_queue is not None:
+            try:
+                batch.append(self._progress_queue.get_nowait() + "\n")
+            except queue.Empty:
+                break
+        if batch:
+            self.text.configure(state="normal")
+            self.text.insert("end", "".join(batch))
+            self.text.see("end")
+            self.text.configure(state="disabled")
+
+    def _drain_log(self):
+        self._flush_log()
+
+        # finished job? surface its result/error here, on the UI thread
+        if self._job is not None and self._job[0].done():
+            job, self._job = self._job, None
+            self._on_done(*job)
+
+        self.after(50, self._drain_log)
+
+    # ---------- background jobs ----------
+    def _set_busy(self, busy: bool):
+        flag = ["disabled"] if busy else ["!disabled"]
+        self.btn_core_only.state(flag)
+        self.btn_ingest_core.state(flag)
+
+    def _submit(self, label: str, success_msg, fn, *args, executor=None):
+        # no prewarm may still hold a handle on the files the job replaces
+        # (Windows: os.replace fails on a file open without FILE_SHARE_DELETE)
+        self._stop_prewarm()
+        self._set_busy(True)
+        executor = executor or self._executor
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool as e:
+            # the idle child died since the last run: submit raises right here
+            # and _on_done never runs, so recover and report now
+            self._reset_pool()
+            self._set_busy(False)
+            self._log(f"ERROR ({label}): the worker process had stopped; run it again.")
+            self._flush_log()
+            messagebox.showerror("Run failed", str(e) or "The worker process had stopped; run it again.")
+            return
+        self._job = (future, label, success_msg)
+
+    def _process_pool(self):
+        if self._pool is None:
+            ctx = mp.get_context("spawn")
+            self._progress_queue = ctx.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=ctx,
+                initializer=init_worker, initargs=(self._progress_queue,),
+            )
+        return self._pool
+
+    def _reset_pool(self):
+        # drop a broken pool; _process_pool starts a fresh child next run
+        self._pool.shutdown(wait=False)
+        self._pool = None
+
+    def _on_done(self, future, label: str, success_msg=None):
+        self._set_busy(False)
+        e = future.exception()
+        if isinstance(e, BrokenProcessPool):
+            # child died (crash / killed); start a fresh one next run
+            self._reset_pool()
+        if e is not None:
+            tb = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+            self._log(f"ERROR ({label}):\n" + tb)
+        # flush the job's last lines before a modal dialog blocks the loop
+        self._flush_log()
+        if e is not None:
+            messagebox.showerror("Run failed", str(e))
+        elif success_msg:
+            messagebox.showinfo("Success", success_msg)
 
     # ---------- file setters ----------
-    def _set_master(self, path: str):
+    @staticmethod
+    def _stat_file(path: str):
+        # one stat per selection; None when it isn't a regular file
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st if stat.S_ISREG(st.st_mode) else None
+
+    def _set_master(self, path: str) -> bool:
         if not path.lower().endswith(".xlsm"):
             messagebox.showwarning("Invalid file", "MASTER must be a .xlsm file.")
-            return
+            return False
+        st = self._stat_file(path)
+        if st is None:
+            messagebox.showwarning("Invalid file", f"MASTER not found: {path}")
+            return False
         self.master_path = path
+        self._master_stat = st
+        self._start_prewarm("master", path)
         self._log(f"MASTER selected: {path}")
+        return True
 
-    def _set_month(self, path: str):
-        if not (path.lower().endswith(".xlsx") or path.lower().endswith(".xls")):
+    def _set_month(self, path: str) -> bool:
+        if not path.lower().endswith((".xlsx", ".xls")):
             messagebox.showwarning("Invalid file", "MONTH report must be .xlsx or .xls.")
-            return
+            return False
+        st = self._stat_file(path)
+        if st is None:
+            messagebox.showwarning("Invalid file", f"MONTH report not found: {path}")
+            return False
         self.month_report_path = path
+        self._month_stat = st
+        self._start_prewarm("month", path)
         self._log(f"MONTH report selected: {path}")
+        return True
+
+    def _start_prewarm(self, slot: str, path: str):
+        # a new pick in the same slot stops the previous file's prewarm
+        self._stop_prewarm(slot)
+        cancel = threading.Event()
+        thread = threading.Thread(target=self._prewarm, args=(path, cancel), daemon=True)
+        self._prewarm_jobs[slot] = (cancel, thread)
+        thread.start()
+
+    def _stop_prewarm(self, *slots: str):
+        # cancel and wait (at most one chunk read) for the given slots, or all
+        for slot in slots or tuple(self._prewarm_jobs):
+            job = self._prewarm_jobs[slot]
+            if job is not None:
+                job[0].set()
+                job[1].join()
+                self._prewarm_jobs[slot] = None
+
+    @staticmethod
+    def _prewarm(path: str, cancel: threading.Event):
+        # Pull a just-selected file into the OS page cache while the user is
+        # still picking files / clicking, so the run's reads come from memory.
+        # Where os.posix_fadvise exists (Linux): ask the kernel for read-ahead
+        # (returns at once). Elsewhere (Windows, macOS): read it through in
+        # 1 MiB chunks, checking cancel
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        except OSError:
+            return
+        try:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                return
+            chunk = bytearray(1 << 20)
+            with open(fd, "rb", buffering=0, closefd=False) as f:
+                while not cancel.is_set() and f.readinto(chunk):
+                    pass
+        except OSError:
+            pass  # best effort only; the run reads the file either way
+        finally:
+            os.close(fd)
 
     # ---------- actions ----------
     def _run_core_only(self):
-        if not self.master_path or not os.path.isfile(self.master_path):
+        if not self.master_path or self._master_stat is None:
             messagebox.showerror("Missing MASTER", "Please select a valid MASTER (.xlsm) file.")
             return
-        try:
-            self._log("Running Core Only...")
-            process_excel_file(self.master_path)
-            self._log("Core processing complete.")
-            messagebox.showinfo("Success", "Core run finished successfully.")
-        except Exception as e:
-            tb = traceback.format_exc()
-            self._log("ERROR (Core Only):\n" + tb)
-            messagebox.showerror("Run failed", str(e))
+        self._submit("Core Only", "Core run finished successfully.",
+                     self._core_only_job, self.master_path, self.fast_save.get())
+
+    def _lazy_import(self):
+        # core on first use; only called on the worker thread
+        if self._process_excel_file is None:
+            from PiramieExcelMaker_core import process_excel_file
+            self._process_excel_file = process_excel_file
+
+    def _core_only_job(self, master_path: str, fast_save: bool):
+        # runs on the worker thread
+        self._log("Running Core Only...")
+        self._lazy_import()
+        self._process_excel_file(master_path, fast_save=fast_save)
+        self._log("Core processing complete.")
 
     def _run_ingest_then_core(self):
-        if not self.master_path or not os.path.isfile(self.master_path):
+        if not self.master_path or self._master_stat is None:
             messagebox.showerror("Missing MASTER", "Please select a valid MASTER (.xlsm) file.")
             return
-        if not self.month_report_path or not os.path.isfile(self.month_report_path):
+        if not self.month_report_path or self._month_stat is None:
             messagebox.showerror("Missing MONTH", "Please select a valid MONTH (.xlsx/.xls) file.")
             return
-
-        try:
-            self._log("Step 1/2: Ingesting month into APR Bundle (backup first)...")
-
-            # call the column-by-column appender
-            summary = ingest_month_into_apr_bundle(self.master_path, self.month_report_path)
-
-            # log what that function actually returns
-            self._log(f"  Backup created: {summary.get('master_backup', '(n/a)')}")
-            rows_appended = summary.get("rows_appended", 0)
-            fr = summary.get("first_row_written")
-            lr = summary.get("last_row_written")
-            range_str = f" (rows {fr}–{lr})" if fr and lr else ""
-            self._log(f"  Rows appended: {rows_appended}{range_str}")
-            self._log(f"  Sheet updated: {summary.get('sheet', 'APR Bundle')}")
-
-            self._log("Step 2/2: Running core processor on MASTER...")
-            process_excel_file(self.master_path)
-            self._log("Core processing complete.")
-
-        except Exception as e:
-            tb = traceback.format_exc()
-            self._log("ERROR (Ingest + Core):\n" + tb)
-            messagebox.showerror("Run failed", str(e))
+        # ingest + core run in the child process; progress comes back over
+        # the pool's queue
+        self._submit("Ingest + Core", None,
+                     run_pipeline, self.master_path, self.month_report_path, MONTH_ENGINE, self.fast_save.get(),
+                     executor=self._process_pool())
 
 
 if __name__ == "__main__":
+    mp.freeze_support()  # spawned workers in a frozen (PyInstaller) build
     app = App()
     app.mainloop()
@@ -0,0 +1,236 @@
+"""
+PiramieExcelMaker_ooxml.py
+---------------------------------
+Zip / XML helpers shared by the fast save paths (the APR Bundle row splice in
+PiramieExcelMaker_append and the write-only Molo Molo Auto swap in
+PiramieExcelMaker_core), which edit the master's xlsm zip directly instead of
+round-tripping it through openpyxl.
+
+  mapped(path)                       read-only memory map for the read paths
+  sheet_part(zin, name)              (sheet index, zip member) of a worksheet
+  sheets_have_formulas(path, names)  cheap <f> scan, no parsing
+  add_cell_formats(styles, xfs, fmts)  reuse / append cellXfs in styles.xml
+  write_zip_copy(zin, path, replaced)  copy the zip with some parts swapped
+"""
+
+import contextlib
+import mmap
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+from xml.sax.saxutils import quoteattr
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+STYLE_RE = re.compile(rb'\bs="(\d+)"')
+FORMULA_RE = re.compile(rb'<(?:\w+:)?f[\s>/]')
+
+
+class _ReadOnlyMap(mmap.mmap):
+    # zipfile wants a file object that reports seekable() (mmap only grew it in 3.13)
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+
+@contextlib.contextmanager
+def mapped(path: str):
+    """
+    Read-only memory map of a workbook, for the read paths (openpyxl and
+    read_excel take the file-like): the archive is paged in on demand instead
+    of copied through buffered reads. Empty files can't be mapped; the path is
+    yielded as-is then. Leave the block before saving over the same file
+    (Windows refuses to replace a mapped file).
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield path
+            return
+        with _ReadOnlyMap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def part_path(base: str, target: str) -> str:
+    """Resolve a relationship Target against the part it belongs to (zip member name)."""
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), target))
+
+
+def rels_path(part: str) -> str:
+    return posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+
+
+def rel_targets(zin: zipfile.ZipFile, part: str) -> Dict[str, tuple]:
+    """Relationship Id -> (Type, zip member name) for a part; empty if it has no rels."""
+    try:
+        root = ET.fromstring(zin.read(rels_path(part)))
+    except KeyError:
+        return {}
+    return {
+        rel.get("Id"): (rel.get("Type", ""), part_path(part, rel.get("Target", "")))
+        for rel in root.iter(f"{NS_PKG_REL}Relationship")
+        if rel.get("TargetMode") != "External"
+    }
+
+
+def sheet_part(zin: zipfile.ZipFile, sheet_name: str) -> Optional[tuple]:
+    """(sheet index, zip member name) of a worksheet, located via workbook.xml + its rels."""
+    wb_part = "xl/workbook.xml"
+    sheets = list(ET.fromstring(zin.read(wb_part)).iter(f"{NS_MAIN}sheet"))
+    idx = next((i for i, sh in enumerate(sheets) if sh.get("name") == sheet_name), None)
+    if idx is None:
+        return None
+    rel = rel_targets(zin, wb_part).get(sheets[idx].get(f"{NS_REL}id"))
+    if rel is None:
+        return None
+    return idx, rel[1]
+
+
+def sheet_count(zin: zipfile.ZipFile) -> int:
+    return sum(1 for _ in ET.fromstring(zin.read("xl/workbook.xml")).iter(f"{NS_MAIN}sheet"))
+
+
+def sheets_have_formulas(path: str, sheet_names) -> bool:
+    """
+    True if any of the named sheets stores a formula cell (or can't be checked).
+    Scans the sheet XML in chunks for <f> elements; nothing is parsed.
+    """
+    try:
+        with zipfile.ZipFile(path) as zin:
+            for name in sheet_names:
+                located = sheet_part(zin, name)
+                if located is None:
+                    continue
+                with zin.open(located[1]) as f:
+                    carry = b""
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        if FORMULA_RE.search(carry + chunk):
+                            return True
+                        carry = chunk[-16:]
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        return True
+    return False
+
+
+_XF_IDS = ("numFmtId", "fontId", "fillId", "borderId", "xfId")
+
+
+def _xf_key(xf):
+    # ids default to 0; other attributes only count when set (openpyxl writes
+    # pivotButton="0" quotePrefix="0", Excel leaves them out)
+    attrs = {k: xf.get(k, "0") for k in _XF_IDS}
+    attrs.update((k, v) for k, v in xf.attrib.items() if k not in _XF_IDS and v not in ("0", "false"))
+    return (tuple(sorted(attrs.items())),
+            tuple((child.tag.replace(NS_MAIN, ""), tuple(sorted(child.attrib.items()))) for child in xf))
+
+
+def _count(tag: str, n: int) -> str:
+    if 'count="' in tag:
+        return re.sub(r'\bcount="\d+"', f'count="{n}"', tag, count=1)
+    return tag[:-1] + f' count="{n}">'
+
+
+def add_cell_formats(styles: str, xfs, num_fmts: Dict[str, str]) -> Optional[tuple]:
+    """
+    Make the cell formats xfs (<xf> elements of another styles part, whose
+    custom number formats are num_fmts: numFmtId -> formatCode) available in
+    the styles.xml text styles. An xf the master already has is reused, the
+    rest are appended to its cellXfs (custom number formats likewise).
+    Returns (new styles text, master cellXfs index per xf), or None when
+    styles.xml has an unusual layout or an xf uses a font / fill / border
+    (those ids only mean something in their own styles part).
+    """
+    xfs_open = re.search(r'<cellXfs\b[^>]*>', styles)
+    xfs_close = styles.find("</cellXfs>")
+    if xfs_open is None or xfs_open.group(0).endswith("/>") or xfs_close < 0:
+        return None
+    styles_root = ET.fromstring(styles)
+    master_xfs = styles_root.find(f"{NS_MAIN}cellXfs")
+    base = len(re.findall(r'<xf\b', styles[xfs_open.end():xfs_close]))
+    if master_xfs is None or len(master_xfs) != base:
+        return None
+
+    master_styles = {}
+    for i, xf in enumerate(master_xfs):
+        master_styles.setdefault(_xf_key(xf), i)
+
+    #custom number formats: reuse the master's id for the same code, else add one
+    master_fmts = {fmt.get("formatCode"): fmt.get("numFmtId")
+                   for fmt in styles_root.iter(f"{NS_MAIN}numFmt")}
+    next_fmt = max([int(i) for i in master_fmts.values()] + [163]) + 1
+    new_fmts = []
+    fmt_map = {}
+    for fmt_id, code in num_fmts.items():
+        if code not in master_fmts:
+            master_fmts[code] = str(next_fmt)
+            new_fmts.append(f'<numFmt numFmtId="{next_fmt}" formatCode={quoteattr(code)}/>')
+            next_fmt += 1
+        fmt_map[fmt_id] = master_fmts[code]
+
+    indexes: List[int] = []
+    new_xfs = []
+    for xf in xfs:
+        if any(xf.get(k, "0") != "0" for k in ("fontId", "fillId", "borderId")):
+            return None
+        xf.set("numFmtId", fmt_map.get(xf.get("numFmtId", "0"), xf.get("numFmtId", "0")))
+        if _xf_key(xf) in master_styles:
+            indexes.append(master_styles[_xf_key(xf)])
+            continue
+        children = "".join(
+            f"<{child.tag.replace(NS_MAIN, '')}"
+            + "".join(f" {k}={quoteattr(v)}" for k, v in child.attrib.items()) + "/>"
+            for child in xf
+        )
+        new_xfs.append("<xf" + "".join(f" {k}={quoteattr(v)}" for k, v in xf.attrib.items())
+                       + (f">{children}</xf>" if children else "/>"))
+        master_styles[_xf_key(xf)] = base + len(new_xfs) - 1
+        indexes.append(base + len(new_xfs) - 1)
+
+    styles = (styles[:xfs_open.start()] + _count(xfs_open.group(0), base + len(new_xfs))
+              + styles[xfs_open.end():xfs_close] + "".join(new_xfs) + styles[xfs_close:])
+    if new_fmts:
+        fmts_open = re.search(r'<numFmts\b[^>]*>', styles)
+        fmts_xml = f'<numFmts count="{len(new_fmts)}">' + "".join(new_fmts) + "</numFmts>"
+        if fmts_open is None:
+            root_open = re.search(r'<styleSheet\b[^>]*>', styles)
+            if root_open is None or root_open.group(0).endswith("/>"):
+                return None
+            styles = styles[:root_open.end()] + fmts_xml + styles[root_open.end():]
+        elif fmts_open.group(0).endswith("/>"):
+            styles = styles[:fmts_open.start()] + fmts_xml + styles[fmts_open.end():]
+        else:
+            fmts_close = styles.find("</numFmts>")
+            count = len(re.findall(r'<numFmt\b', styles[fmts_open.end():fmts_close])) + len(new_fmts)
+            styles = (styles[:fmts_open.start()] + _count(fmts_open.group(0), count)
+                      + styles[fmts_open.end():fmts_close] + "".join(new_fmts) + styles[fmts_close:])
+    return styles, indexes
+
+
+def write_zip_copy(zin: zipfile.ZipFile, path: str, replaced: Dict[str, bytes]) -> str:
+    """
+    Copy every member of zin into a temp file next to path, swapping in the
+    replaced parts. Returns the temp file; the caller os.replace()s it over
+    path once zin is closed (Windows won't replace an open file).
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp_path, "w") as zout:
+            for item in zin.infolist():
+                data = replaced.get(item.filename)
+                zout.writestr(item, zin.read(item) if data is None else data)
+        shutil.copymode(path, tmp_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
@@ -0,0 +1,121 @@
+"""
+PiramieExcelMaker_workers.py
+---------------------------------
+Entry points the GUI runs in a spawned child process, so openpyxl's parsing
+runs outside the GUI's GIL and its memory (cell/style caches, big strings)
+is given back to the OS with the child instead of piling up in the GUI
+across repeated runs.
+
+  run_pipeline(MASTER, MONTH) -> summary dict
+     - loads MASTER once, backs it up
+     - ingest_month_into_apr_bundle_wb(wb, MONTH), then process_excel_file_wb(wb)
+     - saves MASTER once
+     fast_save (the GUI default) and the load-once path are mutually
+     exclusive: fast_save runs the file-based steps instead, which splice their
+     rows / the write-only Molo Molo Auto sheet into the zip without a full
+     openpyxl load or save
+
+Progress lines go to the multiprocessing queue handed to init_worker (the
+pool initializer); the GUI drains it into its log box.
+The heavy modules are imported lazily, inside the child.
+"""
+
+import os
+
+_progress = None  # multiprocessing queue, set per worker process by init_worker
+
+
+def init_worker(progress_queue) -> None:
+    """ProcessPoolExecutor initializer: remember where progress lines go."""
+    global _progress
+    _progress = progress_queue
+
+
+def _log(msg: str) -> None:
+    if _progress is not None:
+        _progress.put(msg)
+
+
+def run_pipeline(master_path: str, month_report_path: str, reader_engine=None, fast_save=False) -> dict:
+    """
+    Ingest the month report into MASTER, then run the core processor on it.
+    The master is loaded once (keep_vba), backed up, updated by both steps in
+    memory and saved once. Falls back to the two file-based calls when the
+    in-memory variants aren't available, or when APR Bundle / Molo Molo hold
+    formulas (the in-memory core would read their text, not their values).
+    reader_engine: optional pd.read_excel engine for the month report.
+    fast_save: run the file-based steps with their zip-splicing fast saves
+    (process_excel_file(fast_save=True)) instead of the single openpyxl save.
+    """
+    import PiramieExcelMaker_append as append
+    import PiramieExcelMaker_core as core
+    import PiramieExcelMaker_ooxml as ooxml
+
+    ingest_wb = getattr(append, "ingest_month_into_apr_bundle_wb", None)
+    core_wb = getattr(core, "process_excel_file_wb", None)
+    if fast_save or ingest_wb is None or core_wb is None:
+        return _run_pipeline_files(master_path, month_report_path, reader_engine, fast_save)
+
+    from openpyxl import load_workbook
+
+    if not os.path.isfile(master_path):
+        raise FileNotFoundError(f"Master not found: {master_path}")
+
+    # the in-memory core reads the live sheets, where a formula cell holds its
+    # formula text; the file-based core reads the cached values
+    if ooxml.sheets_have_formulas(master_path, (append.APR_SHEET, "Molo Molo")):
+        _log("Formulas in APR Bundle / Molo Molo: running ingest and core as separate steps.")
+        return _run_pipeline_files(master_path, month_report_path, reader_engine, fast_save)
+
+    _log("Step 1/2: Ingesting month into APR Bundle (backup first)...")
+    with ooxml.mapped(master_path) as src:  # fully read here; unmapped before the save
+        wb = load_workbook(src, keep_vba=True)
+    backup_path = append._backup_master(master_path)  # before the one save below
+    summary = ingest_wb(wb, month_report_path, master_xlsm_path=master_path, backup_path=backup_path,
+                        reader_engine=reader_engine)
+    _log_summary(summary)
+
+    _log("Step 2/2: Running core processor on MASTER...")
+    core_wb(wb)
+    wb.save(master_path)
+    wb.close()
+    _log("Core processing complete.")
+
+    return summary
+
+
+def _run_pipeline_files(master_path: str, month_report_path: str, reader_engine=None, fast_save=False) -> dict:
+    # legacy path: each step opens and saves the master itself
+    from PiramieExcelMaker_append import _backup_master, ingest_month_into_apr_bundle
+    from PiramieExcelMaker_core import process_excel_file
+
+    _log("Step 1/2: Ingesting month into APR Bundle (backup first)...")
+
+    # backup up front (clone / kernel copy), so the ingest can skip its own
+    if not os.path.isfile(master_path):
+        raise FileNotFoundError(f"Master not found: {master_path}")
+    backup_path = _backup_master(master_path)
+
+    # call the column-by-column appender
+    summary = ingest_month_into_apr_bundle(master_path, month_report_path, do_backup=False,
+                                           reader_engine=reader_engine)
+    summary["master_backup"] = backup_path
+    _log_summary(summary)
+
+    _log("Step 2/2: Running core processor on MASTER...")
+    process_excel_file(master_path, fast_save=fast_save)
+    _log("Core processing complete.")
+
+    return summary
+
+
+def _log_summary(summary: dict) -> None:
+    # log what the ingest actually returns
+    _log(f"  Backup created: {summary.get('master_backup', '(n/a)')}")
+    rows_added = summary.get("rows_added", 0)
+    # rows_before / rows_after count data rows; the sheet rows sit one below (header)
+    range_str = ""
+    if rows_added and "rows_before" in summary and "rows_after" in summary:
+        range_str = f" (rows {summary['rows_before'] + 2}–{summary['rows_after'] + 1})"
+    _log(f"  Rows appended: {rows_added}{range_str}")
+    _log(f"  Sheet updated: {summary.get('sheet', 'APR Bundle')}")
@@ -0,0 +1,21 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def master(tmp_path):
+    # a copy of the sample master, named like the real .xlsm
+    path = tmp_path / "Master.xlsm"
+    shutil.copyfile(os.path.join(ROOT, "Master_Workbook_Sample.xlsx"), path)
+    return str(path)
+
+
+@pytest.fixture
+def samples():
+    return ROOT
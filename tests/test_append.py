@@ -0,0 +1,203 @@
+import os
+import re
+import shutil
+import zipfile
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+from openpyxl.worksheet.table import Table
+
+import PiramieExcelMaker_append as append
+import PiramieExcelMaker_ooxml as ooxml
+
+
+@pytest.mark.parametrize("report", ["Purchases_Report_Sample.xlsx", "Purchases_Report_Sample_May_v2.xlsx"])
+def test_calamine_reader_matches_openpyxl_read(samples, report):
+    pytest.importorskip("python_calamine")
+    path = os.path.join(samples, report)
+
+    expected = append._read_month_file(path)
+    got = append._read_month_file(path, reader_engine="calamine")
+    assert got["MSISDN"].tolist() == expected["MSISDN"].tolist()
+    assert got["MSISDN"].str.startswith("0").all()
+    assert got.equals(expected)
+
+
+def _set_dimension(path, sheet_part, ref):
+    # rewrite a sheet's <dimension ref> in place, like a stale export would have it
+    with zipfile.ZipFile(path) as zin:
+        items = [(item, zin.read(item)) for item in zin.infolist()]
+    with zipfile.ZipFile(path, "w") as zout:
+        for item, data in items:
+            if item.filename == sheet_part:
+                data = re.sub(rb'(<dimension ref=")[^"]*', rb"\g<1>" + ref.encode(), data, count=1)
+                assert ref.encode() in data
+            zout.writestr(item, data)
+
+
+def test_stale_apr_dimension_still_dedupes(master, samples):
+    month = os.path.join(samples, "Purchases_Report_Sample_May_v2.xlsx")
+    first = append.ingest_month_into_apr_bundle(master, month, do_backup=False)
+    assert first["rows_added"] == 30
+
+    with zipfile.ZipFile(master) as z:
+        _, part = ooxml.sheet_part(z, append.APR_SHEET)
+    _set_dimension(master, part, "A1:J2")
+    again = append.ingest_month_into_apr_bundle(master, month, do_backup=False)
+    assert (again["rows_added"], again["dedupe_skipped"]) == (0, 30)
+    assert again["rows_before"] == first["rows_after"]
+
+
+def test_month_report_with_stale_dimension_reads_every_row(samples, tmp_path):
+    month = str(tmp_path / "month.xlsx")
+    shutil.copyfile(os.path.join(samples, "Purchases_Report_Sample_May_v2.xlsx"), month)
+    expected = append._read_month_file(month)
+
+    _set_dimension(month, "xl/worksheets/sheet1.xml", "A1")
+    got = append._read_month_file(month)
+    assert len(got) == len(expected) == 30
+    assert got.equals(expected)
+
+
+def _apr_snapshot(path):
+    wb = load_workbook(path)
+    ws = wb[append.APR_SHEET]
+    with zipfile.ZipFile(path) as z:
+        filter_names = re.findall(r'<definedName name="_xlnm._FilterDatabase"[^>]*>([^<]*)<',
+                                  z.read("xl/workbook.xml").decode("utf-8"))
+    return {
+        "cells": [[(c.value, c.number_format, c.font.b, c.fill.fgColor.rgb) for c in row] for row in ws.iter_rows()],
+        "auto_filter": ws.auto_filter.ref,
+        "tables": {t.displayName: (t.ref, t.autoFilter.ref if t.autoFilter else None) for t in ws.tables.values()},
+        "filter_names": filter_names,
+        "sheets": wb.sheetnames,
+    }
+
+
+def _plain(ws):
+    pass  # sample sheet as is
+
+
+def _with_table(ws):
+    ws.add_table(Table(displayName="Apr", ref=f"A1:J{ws.max_row}"))
+
+
+def _with_autofilter(ws):
+    ws.auto_filter.ref = f"A1:J{ws.max_row}"
+
+
+def _trailing_formatted_row(ws):
+    ws.cell(row=ws.max_row + 20, column=1).number_format = "0.00"
+
+
+def _styled_last_date(ws):
+    # new date cells must not inherit the last date cell's format / font / fill
+    cell = ws.cell(row=ws.max_row, column=4)
+    cell.number_format = "dd/mm/yyyy"
+    cell.fill = PatternFill("solid", fgColor="FFFFFF00")
+    cell.font = Font(bold=True)
+
+
+def _no_plain_date_format(ws):
+    # the plain date cell format has to be added to styles.xml
+    for r in range(2, ws.max_row + 1):
+        ws.cell(row=r, column=4).number_format = "dd/mm/yyyy"
+
+
+def _date1904(ws):
+    ws.parent.epoch = CALENDAR_MAC_1904
+
+
+@pytest.mark.parametrize("prepare, spliced", [
+    (_plain, True),
+    (_with_table, True),
+    (_with_autofilter, True),
+    (_styled_last_date, True),
+    (_no_plain_date_format, True),
+    (_trailing_formatted_row, False),
+    (_date1904, False),
+])
+def test_splice_matches_openpyxl_path(master, samples, tmp_path, monkeypatch, prepare, spliced):
+    wb = load_workbook(master)
+    prepare(wb[append.APR_SHEET])
+    wb.save(master)
+    (tmp_path / "fallback").mkdir()
+    fallback = str(tmp_path / "fallback" / "Master.xlsm")
+    shutil.copyfile(master, fallback)
+
+    months = [os.path.join(samples, name) for name in
+              ("Purchases_Report_Sample_May_v2.xlsx", "Purchases_Report_Sample.xlsx")]
+    splice = append._splice_rows_into_master
+    results = []
+    monkeypatch.setattr(append, "_splice_rows_into_master",
+                        lambda *args: results.append(splice(*args)) or results[-1])
+    for month in months:
+        append.ingest_month_into_apr_bundle(master, month, do_backup=False)
+    assert (results[0] is not None) == spliced  # later months may splice after a fill-in
+
+    monkeypatch.setattr(append, "_splice_rows_into_master", lambda *args: None)
+    for month in months:
+        append.ingest_month_into_apr_bundle(fallback, month, do_backup=False)
+
+    assert _apr_snapshot(master) == _apr_snapshot(fallback)
+
+
+APR_HEADER = ["CUSTOMER_NAME", "CUSTOMER_TYPE", "MSISDN", "Purchase Date", "PRODUCT_NAME",
+              "PURCHASE_AMT", "STAT", "API  Credit Type", "PRODUCT_ID", "CONTRACT_ID"]
+
+
+def _month_row(msisdn="0712345678", date="2024-05-01 10:00:00", amount=1234.5, **extra):
+    return {"Cust Name": "Jane", "MSISDN": msisdn, "Purchase Date": date, "Prod Name": "Bundle 1GB",
+            "Amount": amount, "Prod Code": "P1", "CRTR_ID": "C1", **extra}
+
+
+def _plan(apr_rows, month_rows, header=APR_HEADER):
+    # the APR scan and the dedupe plan as the ingest runs them, on an in-memory sheet
+    ws = Workbook().active
+    ws.append(header)
+    for row in apr_rows:
+        ws.append([row.get(h) for h in header])
+    existing_keys, _, _ = append._read_existing_keys(ws)
+    month_df = append._coerce_and_derive(pd.DataFrame(month_rows))
+    _, _, _, new_df, skipped = append._plan_append(month_df, existing_keys, append._build_apr_header_index(ws))
+    return new_df, skipped
+
+
+def test_dedupe_skips_repeats_within_the_month_file():
+    new_df, skipped = _plan([], [_month_row(), _month_row(), _month_row(msisdn="0799999999")])
+    assert new_df["MSISDN"].tolist() == ["0712345678", "0799999999"]
+    assert skipped == 1
+
+
+def test_dedupe_matches_apr_rows_after_normalization():
+    apr = [{"MSISDN": " 0712345678 ", "Purchase Date": datetime(2024, 5, 1, 10, 0, 0),
+            "PRODUCT_NAME": "Bundle 1GB ", "PURCHASE_AMT": "$1,234.50", "PRODUCT_ID": "P1", "CONTRACT_ID": "C1"}]
+    month = [_month_row(date="2024-05-01 10:00:00.400"),  # same second
+             _month_row(date="2024-05-01 10:00:01")]
+    new_df, skipped = _plan(apr, month)
+    assert skipped == 1
+    assert new_df["Purchase Date"].tolist() == [pd.Timestamp("2024-05-01 10:00:01")]
+
+
+def test_dedupe_uses_only_the_identity_columns_apr_has():
+    header = [h for h in APR_HEADER if h not in ("PRODUCT_ID", "CONTRACT_ID")]
+    apr = [{"MSISDN": "0712345678", "Purchase Date": datetime(2024, 5, 1, 10, 0, 0),
+            "PRODUCT_NAME": "Bundle 1GB", "PURCHASE_AMT": 1234.5}]
+    month = [_month_row(**{"Prod Code": "P2", "CRTR_ID": "C2"}),  # differs only where APR has no column
+             _month_row(msisdn="0799999999")]
+    new_df, skipped = _plan(apr, month, header)
+    assert skipped == 1
+    assert new_df["MSISDN"].tolist() == ["0799999999"]
+
+
+def test_rows_without_mapped_values_are_dropped_not_counted():
+    blank = {"Cust Name": None, "MSISDN": None, "Purchase Date": None, "Prod Name": None,
+             "Amount": None, "Prod Code": None, "CRTR_ID": None}
+    new_df, skipped = _plan([], [blank, _month_row(), dict(blank)])
+    assert new_df["MSISDN"].tolist() == ["0712345678"]
+    assert skipped == 0
+
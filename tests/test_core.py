@@ -0,0 +1,100 @@
+import shutil
+
+import pytest
+from openpyxl import load_workbook
+from openpyxl.styles import Font
+
+import PiramieExcelMaker_core as core
+from PiramieExcelMaker_core import process_excel_file
+
+
+def _sheet_snapshot(ws):
+    return {
+        "cells": [[(c.value, c.number_format, c.alignment.horizontal) for c in row] for row in ws.iter_rows()],
+        "merged": sorted(str(r) for r in ws.merged_cells.ranges),
+        "widths": {k: round(v.width or 0, 2) for k, v in ws.column_dimensions.items()},
+        "freeze": ws.freeze_panes,
+    }
+
+
+def _styled_master(master):
+    # an existing Molo Molo Auto sheet plus custom number formats / cell xfs elsewhere
+    process_excel_file(master)
+    wb = load_workbook(master)
+    apr = wb["APR Bundle"]
+    apr["F2"].number_format = "0.000"
+    apr["F3"].number_format = "#,##0.00 [$€-x-euro2]"
+    apr["A2"].font = Font(bold=True)
+    wb["Molo Molo"]["C2"].number_format = "dd/mm/yyyy"
+    wb.save(master)
+
+
+def test_fast_save_matches_openpyxl_save(master, tmp_path, monkeypatch):
+    _styled_master(master)
+    slow = str(tmp_path / "slow" / "Master.xlsm")
+    (tmp_path / "slow").mkdir()
+    shutil.copyfile(master, slow)
+
+    swapped = []
+    fast_writer = core._write_molo_molo_auto_fast
+    monkeypatch.setattr(core, "_write_molo_molo_auto_fast",
+                        lambda *args: swapped.append(fast_writer(*args)) or swapped[-1])
+    process_excel_file(master, fast_save=True)
+    process_excel_file(master, fast_save=True)  # second run reuses the merged styles
+    process_excel_file(slow)
+    assert swapped == [True, True]
+
+    fast_wb, slow_wb = load_workbook(master), load_workbook(slow)
+    assert fast_wb.sheetnames == slow_wb.sheetnames
+    for name in slow_wb.sheetnames:
+        assert _sheet_snapshot(fast_wb[name]) == _sheet_snapshot(slow_wb[name]), name
+    assert fast_wb["APR Bundle"]["A2"].font.bold
+    assert fast_wb.active.title == slow_wb.active.title
+
+
+def test_fast_save_falls_back_without_molo_molo_auto(master):
+    assert load_workbook(master, read_only=True).sheetnames.count("Molo Molo Auto") == 0
+    process_excel_file(master, fast_save=True)
+    assert "Molo Molo Auto" in load_workbook(master).sheetnames
+
+
+def test_fast_save_keeps_openpyxl_tab_order(master, tmp_path, monkeypatch):
+    # openpyxl recreates Molo Molo Auto as the last tab; the swap must not keep it first
+    process_excel_file(master)
+    wb = load_workbook(master)
+    wb.move_sheet("Molo Molo Auto", offset=-(len(wb.sheetnames) - 1))
+    wb.save(master)
+    slow = str(tmp_path / "slow.xlsm")
+    shutil.copyfile(master, slow)
+
+    swapped = []
+    fast_writer = core._write_molo_molo_auto_fast
+    monkeypatch.setattr(core, "_write_molo_molo_auto_fast",
+                        lambda *args: swapped.append(fast_writer(*args)) or swapped[-1])
+    process_excel_file(master, fast_save=True)
+    assert swapped == [False]
+    process_excel_file(slow)
+    assert load_workbook(master).sheetnames == load_workbook(slow).sheetnames
+
+
+def _unmatched_molo(path):
+    # Molo Molo MSISDNs that match no APR Bundle row -> no month columns
+    wb = load_workbook(path)
+    ws = wb["Molo Molo"]
+    for r in range(2, ws.max_row + 1):
+        ws.cell(row=r, column=2, value=f"0700000{r:04d}")
+    wb.save(path)
+    return [ws.cell(row=r, column=2).value for r in range(2, ws.max_row + 1)]
+
+
+@pytest.mark.parametrize("fast_save", [False, True])
+def test_molo_molo_auto_without_months_keeps_first_row(master, fast_save):
+    msisdns = _unmatched_molo(master)
+    process_excel_file(master)
+    if fast_save:
+        process_excel_file(master, fast_save=True)  # swaps in the existing sheet
+
+    ws = load_workbook(master)["Molo Molo Auto"]
+    assert ws.max_row == 2 + len(msisdns)
+    assert str(ws["A3"].value).lstrip("0") == msisdns[0].lstrip("0")
+    assert "A1:A2" in {str(r) for r in ws.merged_cells.ranges}
@@ -0,0 +1,39 @@
+import os
+
+from openpyxl import load_workbook
+
+import PiramieExcelMaker_append as append
+import PiramieExcelMaker_ooxml as ooxml
+import PiramieExcelMaker_workers as workers
+
+
+def test_formulas_detected_in_apr_bundle(master):
+    assert not ooxml.sheets_have_formulas(master, (append.APR_SHEET, "Molo Molo"))
+
+    wb = load_workbook(master)
+    wb[append.APR_SHEET]["F2"] = "=50+8.98"
+    wb.save(master)
+    assert ooxml.sheets_have_formulas(master, (append.APR_SHEET, "Molo Molo"))
+
+
+def test_run_pipeline_with_formulas_uses_file_based_steps(master, samples, monkeypatch):
+    wb = load_workbook(master)
+    wb[append.APR_SHEET]["F2"] = "=50+8.98"
+    wb.save(master)
+
+    calls = []
+    monkeypatch.setattr(workers, "_run_pipeline_files", lambda *args: calls.append(args) or {})
+    month = os.path.join(samples, "Purchases_Report_Sample_May_v2.xlsx")
+    workers.run_pipeline(master, month)
+    assert calls == [(master, month, None, False)]
+
+
+def test_run_pipeline_logs_the_appended_rows(master, samples, monkeypatch):
+    lines = []
+    monkeypatch.setattr(workers, "_log", lines.append)
+    summary = workers.run_pipeline(master, os.path.join(samples, "Purchases_Report_Sample_May_v2.xlsx"))
+
+    assert summary["rows_added"] > 0
+    first = summary["rows_before"] + 2
+    last = load_workbook(master, read_only=True)[append.APR_SHEET].max_row
+    assert f"  Rows appended: {summary['rows_added']} (rows {first}–{last})" in lines